@@ -12,38 +12,87 @@ IF300 季月合约数据更新模块
 """
 
 import os
+import io
 import sys
+import json
+import bisect
+import time
+import functools
+import concurrent.futures
 import pandas as pd
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
 
 
+# 读取K线CSV时直接指定的列类型（价格保持float64，写回CSV时不会出现float32的尾数）
+CSV_DTYPES = {'开盘': 'float64', '最高': 'float64', '最低': 'float64', '收盘': 'float64', '合约': 'string'}
+
+# 旧版CSV中的价格列名 -> 现用列名
+LEGACY_PRICE_COLUMNS = {'开盘价': '开盘', '最高价': '最高', '最低价': '最低', '收盘价': '收盘'}
+
+# 可选：安装pyarrow后在CSV旁保存parquet镜像，读取时跳过CSV解析
+try:
+    import pyarrow.parquet as pq
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+# 可选：安装orjson后用其解析行情接口返回的JSON
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# 并行查询实时行情时等待各数据源的最长时间（秒）
+REALTIME_TIMEOUT = 6
+
+# 前一交易日K线缓存 {(合约, 日期): (获取时间, K线)}，有效期内重复刷新不再请求
+KLINE_CACHE_TTL = 3600
+_kline_cache = {}
+
+# 交易时段分界（以分钟计）：9:30、11:30之后、13:00、15:00之后
+TRADING_BOUNDARIES = (9 * 60 + 30, 11 * 60 + 31, 13 * 60, 15 * 60 + 1)
+# 各区间对应的 (是否交易时段, 提示)
+TRADING_STATES = (
+    (False, "盘前，日线数据通常在收盘后(15:00)更新"),
+    (True, "交易时段中，日线数据将在收盘后(15:00)更新"),
+    (False, "午间休市，日线数据将在收盘后(15:00)更新"),
+    (True, "交易时段中，日线数据将在收盘后(15:00)更新"),
+    (False, "已收盘，如数据未更新请稍后重试"),
+)
+
+# 各行情接口共用的HTTP会话，保持长连接，重复请求时免去TCP/TLS握手
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+_session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+# 日K线接口不要求实时，失败时自动重试
+_session.mount('https://stock.finance.sina.com.cn/',
+               HTTPAdapter(pool_maxsize=4, max_retries=Retry(total=2, backoff_factor=0.2)))
+
+
 def _get_current_quarterly_contract():
     """获取当前季月合约代码"""
     now = datetime.now()
-    year = now.year
-    month = now.month
-    day = now.day
-    quarterly_months = [3, 6, 9, 12]
-
-    # 找当前或下一个季月
-    for qm in quarterly_months:
-        if qm > month:
-            return f"IF{year % 100:02d}{qm:02d}"
-        elif qm == month:
-            # 当月需要判断是否已过交割日（第三个周五）
-            # 简化处理：如果是季月且日期>20，使用下一个季月
-            if day > 20:
-                idx = quarterly_months.index(qm)
-                if idx < 3:
-                    return f"IF{year % 100:02d}{quarterly_months[idx+1]:02d}"
-                else:
-                    return f"IF{(year + 1) % 100:02d}03"
-            else:
-                return f"IF{year % 100:02d}{qm:02d}"
+    return _quarterly_contract_on(now.year, now.month, now.day)
 
-    # 如果当年季月都过了，使用下一年3月
-    return f"IF{(year + 1) % 100:02d}03"
+
+@functools.lru_cache(maxsize=64)
+def _quarterly_contract_on(year, month, day):
+    """获取指定日期的季月合约代码（按日期缓存，同一天内多个数据源共用）"""
+    # 当前或下一个季月
+    qm = (month + 2) // 3 * 3
+    # 当月需要判断是否已过交割日（第三个周五）
+    # 简化处理：如果是季月且日期>20，使用下一个季月
+    if qm == month and day > 20:
+        qm += 3
+        if qm > 12:
+            qm = 3
+            year += 1
+    return f"IF{year % 100:02d}{qm:02d}"
 
 
 def _get_realtime_sina():
@@ -52,7 +101,7 @@ def _get_realtime_sina():
         contract = _get_current_quarterly_contract()
         url = f'https://hq.sinajs.cn/list=nf_{contract}'
         headers = {'Referer': 'https://finance.sina.com.cn'}
-        resp = requests.get(url, headers=headers, timeout=5)
+        resp = _session.get(url, headers=headers, timeout=5)
 
         text = resp.text
         if '=""' in text or not text.strip():
@@ -103,8 +152,8 @@ def _get_realtime_eastmoney():
             'fields': 'f12,f14,f2,f3,f4,f5,f6,f15,f16,f17,f18',
             'secids': f'8.{contract}'  # 季月合约
         }
-        resp = requests.get(url, params=params, timeout=3)
-        result = resp.json()
+        resp = _session.get(url, params=params, timeout=3)
+        result = json_loads(resp.content)
 
         if result.get('data') and result['data'].get('diff'):
             items = result['data']['diff']
@@ -142,8 +191,8 @@ def _get_realtime_hexun():
             'number': '1',
             'type': '5'
         }
-        resp = requests.get(url, params=params, timeout=3)
-        result = resp.json()
+        resp = _session.get(url, params=params, timeout=3)
+        result = json_loads(resp.content)
 
         if result and result.get('Data') and len(result['Data']) > 0:
             d = result['Data'][0]
@@ -184,40 +233,71 @@ def get_realtime_price(verify_all=True):
         ('和讯季月', _get_realtime_hexun),
     ]
 
+    # 各数据源相互独立，并行请求，总耗时取决于最慢（或最快）的一个
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(providers))
+    futures = {executor.submit(func): name for name, func in providers}
+
     if not verify_all:
         # 旧的行为：返回第一个成功的
-        for name, func in providers:
-            try:
-                result = func()
-                if result and result.get('price', 0) > 0:
-                    return result
-            except Exception as e:
-                print(f"{name}接口异常: {e}")
-                continue
+        try:
+            for future in concurrent.futures.as_completed(futures, timeout=REALTIME_TIMEOUT):
+                try:
+                    result = future.result()
+                    if result and result.get('price', 0) > 0:
+                        return result
+                except Exception as e:
+                    print(f"{futures[future]}接口异常: {e}")
+        except concurrent.futures.TimeoutError:
+            pass
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
         print("所有实时行情接口均失败")
         return None
 
-    # 新的行为：验证所有数据源
+    # 新的行为：验证所有数据源（已有两个一致的数据源时不再等待其余接口）
+    outcomes = {}
+    prices = []
+    quorum = False
+    try:
+        for future in concurrent.futures.as_completed(futures, timeout=REALTIME_TIMEOUT):
+            name = futures[future]
+            try:
+                outcomes[name] = future.result()
+            except Exception as e:
+                outcomes[name] = e
+                continue
+            if outcomes[name] and outcomes[name].get('price', 0) > 0:
+                prices.append(outcomes[name]['price'])
+                if len(prices) >= 2 and max(prices) - min(prices) <= 1:
+                    quorum = True
+                    break
+    except concurrent.futures.TimeoutError:
+        pass
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # 按接口优先级整理结果
     sources_results = {}
     sources_info = []
 
     for name, func in providers:
-        try:
-            result = func()
-            if result and result.get('price', 0) > 0:
-                sources_results[name] = result
-                sources_info.append({
-                    'source': name,
-                    'price': result.get('price', 0),
-                    'time': result.get('time', ''),
-                    'status': '成功'
-                })
-                print(f"{name}: {result.get('price', 0)}")
-            else:
-                sources_info.append({'source': name, 'status': '无数据'})
-        except Exception as e:
-            sources_info.append({'source': name, 'status': f'失败: {str(e)[:30]}'})
-            print(f"{name}接口异常: {e}")
+        result = outcomes.get(name)
+        if isinstance(result, Exception):
+            sources_info.append({'source': name, 'status': f'失败: {str(result)[:30]}'})
+            print(f"{name}接口异常: {result}")
+        elif name not in outcomes:
+            sources_info.append({'source': name, 'status': '未等待(两源已一致)' if quorum else '超时'})
+        elif result and result.get('price', 0) > 0:
+            sources_results[name] = result
+            sources_info.append({
+                'source': name,
+                'price': result.get('price', 0),
+                'time': result.get('time', ''),
+                'status': '成功'
+            })
+            print(f"{name}: {result.get('price', 0)}")
+        else:
+            sources_info.append({'source': name, 'status': '无数据'})
 
     if not sources_results:
         print("所有实时行情接口均失败")
@@ -250,6 +330,11 @@ def _get_yesterday_kline():
     """
     try:
         contract = _get_current_quarterly_contract()
+        cache_key = (contract, datetime.now().strftime('%Y-%m-%d'))
+        cached = _kline_cache.get(cache_key)
+        if cached is not None and time.monotonic() - cached[0] < KLINE_CACHE_TTL:
+            return dict(cached[1])
+
         # 新浪期货日K线接口
         url = f'https://stock.finance.sina.com.cn/futures/api/jsonp.php/var%20_result=/InnerFuturesNewService.getDailyKLine'
         params = {
@@ -260,7 +345,7 @@ def _get_yesterday_kline():
             'Referer': 'https://finance.sina.com.cn',
             'User-Agent': 'Mozilla/5.0'
         }
-        resp = requests.get(url, params=params, headers=headers, timeout=10)
+        resp = _session.get(url, params=params, headers=headers, timeout=10)
         text = resp.text
 
         # 解析 JSONP 响应: var _result=([...])
@@ -269,8 +354,7 @@ def _get_yesterday_kline():
         if start == -1 or end == -1:
             return None
 
-        import json
-        data = json.loads(text[start+1:end+1])
+        data = json_loads(text[start+1:end+1])
 
         if not data or len(data) < 2:
             return None
@@ -279,7 +363,7 @@ def _get_yesterday_kline():
         # 数据格式: {d: "2026-01-20", o: "4731.6", h: "4743.8", l: "4672.8", c: "4708.6", v: "69659"}
         yesterday = data[-2] if len(data) >= 2 else None
         if yesterday:
-            return {
+            kline = {
                 'date': yesterday.get('d', ''),
                 'open': float(yesterday.get('o', 0)),
                 'high': float(yesterday.get('h', 0)),
@@ -288,6 +372,10 @@ def _get_yesterday_kline():
                 'volume': int(float(yesterday.get('v', 0))),
                 'contract': contract
             }
+            # 只缓存需要的一条K线，完整的历史数据随即释放
+            _kline_cache.clear()
+            _kline_cache[cache_key] = (time.monotonic(), kline)
+            return dict(kline)
         return None
     except Exception as e:
         print(f"获取前一交易日K线失败: {e}")
@@ -304,34 +392,22 @@ def is_trading_time():
     """
     now = datetime.now()
     weekday = now.weekday()  # 0=周一, 6=周日
-    hour = now.hour
-    minute = now.minute
-    current_time = hour * 60 + minute  # 转为分钟数便于比较
+    current_time = now.hour * 60 + now.minute  # 转为分钟数便于比较
 
     # 周末不是交易日
     if weekday >= 5:
         return False, False, "周末休市"
 
-    # 交易时段（以分钟计）
-    morning_start = 9 * 60 + 30   # 9:30
-    morning_end = 11 * 60 + 30    # 11:30
-    afternoon_start = 13 * 60     # 13:00
-    afternoon_end = 15 * 60       # 15:00
-
-    # 判断是否在交易时段
-    in_morning = morning_start <= current_time <= morning_end
-    in_afternoon = afternoon_start <= current_time <= afternoon_end
+    is_trading_hours, time_hint = TRADING_STATES[bisect.bisect_right(TRADING_BOUNDARIES, current_time)]
+    return True, is_trading_hours, time_hint
 
-    if in_morning or in_afternoon:
-        return True, True, "交易时段中，日线数据将在收盘后(15:00)更新"
-    elif current_time < morning_start:
-        return True, False, "盘前，日线数据通常在收盘后(15:00)更新"
-    elif morning_end < current_time < afternoon_start:
-        return True, False, "午间休市，日线数据将在收盘后(15:00)更新"
-    elif current_time > afternoon_end:
-        return True, False, "已收盘，如数据未更新请稍后重试"
 
-    return True, False, ""
+def most_recent_trading_day():
+    """最近一个交易日（从今天往前跳过周末）"""
+    day = datetime.now().date()
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
 
 
 def get_data_path():
@@ -349,8 +425,141 @@ def get_data_path():
     return data_path
 
 
+def normalize_price_columns(df):
+    """旧版价格列（开盘价等）统一为新列名，两者并存时用旧列补齐新列的空值"""
+    renames = {}
+    for old_col, new_col in LEGACY_PRICE_COLUMNS.items():
+        if old_col not in df.columns:
+            continue
+        if new_col in df.columns:
+            df[new_col] = df[new_col].fillna(df[old_col])
+        else:
+            renames[old_col] = new_col
+    return df.rename(columns=renames) if renames else df
+
+
+def _parquet_path(file_path):
+    """CSV对应的parquet镜像路径"""
+    return os.path.splitext(file_path)[0] + '.parquet'
+
+
+def read_kline_csv(file_path, **kwargs):
+    """读取K线CSV，parquet镜像比CSV新时直接读取镜像（同样按usecols/dtype/parse_dates处理）"""
+    parquet_path = _parquet_path(file_path)
+    if HAS_PARQUET and os.path.exists(parquet_path) and \
+            os.stat(parquet_path).st_mtime_ns >= os.stat(file_path).st_mtime_ns:
+        try:
+            return _read_parquet_mirror(parquet_path, kwargs.get('usecols'), kwargs.get('dtype'),
+                                        kwargs.get('parse_dates'))
+        except Exception as e:
+            print(f"读取parquet缓存失败: {e}")
+
+    df = pd.read_csv(file_path, **kwargs)
+    if 'usecols' not in kwargs:
+        save_parquet_mirror(df, file_path)
+    return df
+
+
+def _read_parquet_mirror(parquet_path, usecols=None, dtype=None, parse_dates=None):
+    """读取parquet镜像，列和类型与按相同参数读取CSV的结果一致"""
+    columns = None
+    if usecols is not None:
+        names = pq.read_schema(parquet_path).names
+        columns = [col for col in names if (usecols(col) if callable(usecols) else col in usecols)]
+    df = pd.read_parquet(parquet_path, columns=columns)
+    if dtype:
+        df = df.astype({col: t for col, t in dtype.items() if col in df.columns})
+    for col in parse_dates or ():
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col])
+    return df
+
+
+def read_kline_tail(file_path, rows, **kwargs):
+    """只读取K线CSV的表头和最后rows行，文件行数不够或结尾格式不规范时返回None"""
+    with open(file_path, 'rb') as f:
+        header = f.readline()
+        tail_start, _ = _tail_offset(f, rows)
+        if tail_start is None or tail_start <= len(header):
+            return None
+        f.seek(tail_start)
+        tail = f.read()
+    return pd.read_csv(io.BytesIO(header + tail), **kwargs)
+
+
+def save_parquet_mirror(df, file_path):
+    """将K线数据另存为parquet镜像（未安装pyarrow时跳过），列类型统一为读取CSV时的类型"""
+    if not HAS_PARQUET:
+        return
+    try:
+        # 调用方可能把合约转成category、把成交量等降为窄整数，镜像中还原，与CSV保持一致
+        df = df.astype({col: t for col, t in CSV_DTYPES.items() if col in df.columns})
+        int_cols = [col for col in df.columns if pd.api.types.is_integer_dtype(df[col])]
+        if int_cols:
+            df = df.astype({col: 'int64' for col in int_cols})
+        df.to_parquet(_parquet_path(file_path), compression='zstd', index=False)
+    except Exception as e:
+        print(f"写入parquet缓存失败: {e}")
+
+
+def _tail_offset(f, lines):
+    """返回 (文件最后lines行的起始位置, 换行符)，文件结尾格式不规范时返回 (None, None)"""
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    chunk = min(size, 65536)
+    f.seek(size - chunk)
+    data = f.read(chunk)
+    if not data.endswith(b'\n') or data.endswith(b'\n\n') or data.endswith(b'\n\r\n'):
+        return None, None
+    newline = '\r\n' if data.endswith(b'\r\n') else '\n'
+    pos = len(data) - 1
+    for _ in range(lines):
+        pos = data.rfind(b'\n', 0, pos)
+        if pos < 0:
+            return None, None
+    return size - chunk + pos + 1, newline
+
+
+def save_kline_csv(df, file_path, encoding='utf-8-sig', kept_rows=0, disk_rows=0, file_stat=None, partial=False):
+    """
+    保存K线CSV
+
+    文件读取后未被修改、且前kept_rows行与df一致时，只重写文件末尾变化的行；
+    否则先写临时文件再替换原文件，写入中断不会损坏原数据。
+    partial=True 表示df只是文件末尾的disk_rows行，无法只改写末尾时抛出ValueError
+    """
+    drop_lines = disk_rows - kept_rows
+    if file_stat is not None and kept_rows > 0 and 0 <= drop_lines <= 5:
+        stat = os.stat(file_path)
+        if (stat.st_mtime_ns, stat.st_size) == (file_stat.st_mtime_ns, file_stat.st_size):
+            with open(file_path, 'rb+') as f:
+                tail_start, newline = _tail_offset(f, drop_lines)
+                if tail_start is not None:
+                    tail = df.iloc[kept_rows:].to_csv(index=False, header=False, lineterminator=newline)
+                    f.seek(tail_start)
+                    f.truncate()
+                    f.write(tail.encode('utf-8'))
+                    return
+
+    if partial:
+        raise ValueError("数据文件在读取后被修改，无法只改写末尾")
+
+    tmp_path = file_path + '.tmp'
+    # 与只改写末尾时一样用pandas写入，整文件重写和追加的数字格式保持一致
+    df.to_csv(tmp_path, index=False, encoding=encoding)
+    os.replace(tmp_path, file_path)
+
+
+# 2017~2030年的季月合约代码，模块加载时生成一次
+_QUARTERLY_CONTRACTS = tuple(f"IF{year % 100:02d}{month:02d}"
+                             for year in range(2017, 2031) for month in (3, 6, 9, 12))
+
+
 def get_quarterly_contracts(start_year=2017, end_year=2030):
     """生成季月合约代码列表（3月、6月、9月、12月）"""
+    if 2017 <= start_year <= end_year <= 2030:
+        return list(_QUARTERLY_CONTRACTS[4 * (start_year - 2017):4 * (end_year - 2016)])
+
     contracts = []
     for year in range(start_year, end_year + 1):
         for month in [3, 6, 9, 12]:
@@ -359,36 +568,33 @@ def get_quarterly_contracts(start_year=2017, end_year=2030):
     return contracts
 
 
+@functools.lru_cache(maxsize=64)
 def get_delivery_date(year, month):
     """计算某月的交割日（第三个周五）"""
-    first_day = datetime(year, month, 1)
-    weekday = first_day.weekday()
-    if weekday <= 4:
-        first_friday = first_day + timedelta(days=(4 - weekday))
-    else:
-        first_friday = first_day + timedelta(days=(11 - weekday))
-    third_friday = first_friday + timedelta(days=14)
-    return third_friday
+    # 第三个周五必在15~21日之间
+    day = 15 + (4 - datetime(year, month, 1).weekday()) % 7
+    return datetime(year, month, day)
 
 
 def get_current_quarterly_contract():
     """获取当前应该使用的季月合约代码"""
-    today = datetime.now()
-    year = today.year
-    month = today.month
+    return _contract_for_date(datetime.now().date().isoformat())
 
-    # 季月列表
-    quarterly_months = [3, 6, 9, 12]
 
-    # 找到当前或下一个季月
-    for qm in quarterly_months:
-        if qm >= month:
-            delivery = get_delivery_date(year, qm)
-            if today.date() <= delivery.date():
-                return f"IF{year % 100:02d}{qm:02d}"
+@functools.lru_cache(maxsize=4)
+def _contract_for_date(date_str):
+    """获取指定日期应使用的季月合约代码（按日期缓存，同一天内只计算一次）"""
+    today = datetime.strptime(date_str, '%Y-%m-%d')
+    year = today.year
 
-    # 如果当年季月都过了，使用下一年3月
-    return f"IF{(year + 1) % 100:02d}03"
+    # 当前或下一个季月，已过交割日则顺延到下一个季月
+    qm = (today.month + 2) // 3 * 3
+    if today.date() > get_delivery_date(year, qm).date():
+        qm += 3
+        if qm > 12:
+            qm = 3
+            year += 1
+    return f"IF{year % 100:02d}{qm:02d}"
 
 
 def update_quarterly_data_akshare():
@@ -406,15 +612,10 @@ def update_quarterly_data_akshare():
 
         # 读取现有数据
         if os.path.exists(file_path):
-            df_old = pd.read_csv(file_path)
-            df_old['日期'] = pd.to_datetime(df_old['日期'])
+            df_old = read_kline_csv(file_path, parse_dates=['日期'], dtype=CSV_DTYPES)
 
             # 标准化列：确保价格数据在正确的列中
-            for old_col, new_col in [('开盘价', '开盘'), ('最高价', '最高'), ('最低价', '最低'), ('收盘价', '收盘')]:
-                if old_col in df_old.columns and new_col in df_old.columns:
-                    mask = df_old[new_col].isna()
-                    if mask.any():
-                        df_old.loc[mask, new_col] = df_old.loc[mask, old_col]
+            df_old = normalize_price_columns(df_old)
 
             last_date = df_old['日期'].max()
             print(f"现有数据最新日期: {last_date.strftime('%Y-%m-%d')}")
@@ -468,10 +669,16 @@ def update_quarterly_data_akshare():
                     else:
                         df = df_new
 
-                    df = df.drop_duplicates(subset=['日期'], keep='last')
-                    df = df.sort_values('日期').reset_index(drop=True)
+                    # 新数据都晚于旧数据时日期严格递增，无需去重和排序
+                    dates = df['日期'].to_numpy()
+                    if not (dates[1:] > dates[:-1]).all():
+                        df = df[~df['日期'].duplicated(keep='last')]
+                        if not df['日期'].is_monotonic_increasing:
+                            df = df.sort_values('日期', kind='stable')
+                    df = df.reset_index(drop=True)
 
-                    df.to_csv(file_path, index=False)
+                    save_kline_csv(df, file_path, encoding='utf-8')
+                    save_parquet_mirror(df, file_path)
 
                     return f"数据更新成功，共{len(df)}条记录，最新日期: {df['日期'].max().strftime('%Y-%m-%d')}"
                 else:
@@ -510,13 +717,13 @@ def update_from_main_contract():
         if not os.path.exists(file_path):
             raise Exception("数据文件不存在，请先手动下载历史数据")
 
-        df = pd.read_csv(file_path, encoding='utf-8-sig')
-        df['日期'] = pd.to_datetime(df['日期'])
+        file_stat = os.stat(file_path)
+        df = read_kline_csv(file_path, encoding='utf-8-sig', parse_dates=['日期'], dtype=CSV_DTYPES)
+        disk_columns = list(df.columns)
+        disk_rows = len(df)
 
         # 标准化列名
-        for old_col, new_col in [('开盘价', '开盘'), ('最高价', '最高'), ('最低价', '最低'), ('收盘价', '收盘')]:
-            if old_col in df.columns and new_col not in df.columns:
-                df[new_col] = df[old_col]
+        df = normalize_price_columns(df)
 
         required_cols = ['日期', '开盘', '最高', '最低', '收盘', '成交量', '持仓量', '合约']
         for col in required_cols:
@@ -524,19 +731,12 @@ def update_from_main_contract():
                 df[col] = 0 if col != '合约' else ''
 
         df = df[[c for c in required_cols if c in df.columns]]
-        df = df.sort_values('日期').reset_index(drop=True)
-
-        # 根据日期推断季月合约的函数
-        def infer_quarterly_contract(date):
-            year = date.year
-            month = date.month
-            quarterly_months = [3, 6, 9, 12]
-            for qm in quarterly_months:
-                if qm >= month:
-                    delivery = get_delivery_date(year, qm)
-                    if date.date() <= delivery.date():
-                        return f"IF{year % 100:02d}{qm:02d}"
-            return f"IF{(year + 1) % 100:02d}03"
+        # 与磁盘文件逐行一致的前缀行数，保存时只需重写其后的部分
+        kept_rows = disk_rows if list(df.columns) == disk_columns else 0
+        # CSV通常已按日期排序，只有乱序时才重新排序
+        if not df['日期'].is_monotonic_increasing:
+            df = df.sort_values('日期', kind='stable').reset_index(drop=True)
+            kept_rows = 0
 
         # 如果是交易日，获取当前季月合约的实时数据
         today = datetime.now().date()
@@ -545,6 +745,13 @@ def update_from_main_contract():
 
         is_trade_day, is_trade_hours, time_hint = is_trading_time()
 
+        # 非交易日且最近交易日收盘后已更新过数据，无需再查询网络
+        last_trading_day = most_recent_trading_day()
+        if not is_trade_day and latest_date >= last_trading_day:
+            closed_at = datetime.combine(last_trading_day, datetime.min.time()).replace(hour=15)
+            if datetime.fromtimestamp(os.path.getmtime(file_path)) >= closed_at:
+                return f"非交易日，数据已是最新，最新日期: {latest_date}"
+
         # 获取季月合约实时行情（启用多源验证）
         print("\n【正在查询多数据源】")
         print("  数据源1: 新浪财经 (新浪季月)")
@@ -569,22 +776,23 @@ def update_from_main_contract():
 
                     if len(last_idx) > 0:
                         idx = last_idx[0]
-                        corrections = []
-
-                        # 检查并修正各个字段
-                        for field, api_field in [('开盘', 'open'), ('最高', 'high'), ('最低', 'low'), ('收盘', 'close')]:
-                            old_val = df.loc[idx, field]
-                            new_val = yesterday_kline.get(api_field, 0)
-                            if new_val > 0 and abs(old_val - new_val) > 0.1:
-                                df.loc[idx, field] = new_val
-                                corrections.append(f"{field}:{old_val}→{new_val}")
-
-                        # 修正成交量
-                        old_vol = df.loc[idx, '成交量']
-                        new_vol = yesterday_kline.get('volume', 0)
-                        if new_vol > 0 and old_vol != new_vol:
-                            df.loc[idx, '成交量'] = new_vol
-                            corrections.append(f"成交量:{old_vol}→{new_vol}")
+
+                        # 检查各个字段：价格差异超过0.1点、成交量不一致时修正
+                        fields = ['开盘', '最高', '最低', '收盘', '成交量']
+                        old_vals = [df.at[idx, field] for field in fields]
+                        new_vals = [yesterday_kline.get(k, 0) for k in ('open', 'high', 'low', 'close', 'volume')]
+                        old_arr = np.array(old_vals, dtype=float)
+                        new_arr = np.array(new_vals, dtype=float)
+                        changed = np.abs(old_arr - new_arr) > 0.1
+                        changed[-1] = old_arr[-1] != new_arr[-1]
+                        mask = (new_arr > 0) & changed
+
+                        # 一次性写入所有需要修正的字段
+                        fix = np.flatnonzero(mask)
+                        corrections = [f"{fields[i]}:{old_vals[i]}→{new_vals[i]}" for i in fix]
+                        if len(fix) > 0:
+                            df.loc[idx, [fields[i] for i in fix]] = [new_vals[i] for i in fix]
+                            kept_rows = min(kept_rows, idx)
 
                         if corrections:
                             print(f"已修正{kline_date}数据: {', '.join(corrections)}")
@@ -603,6 +811,7 @@ def update_from_main_contract():
 
                             if abs(old_close - yesterday_close) > 0.1:
                                 df.loc[idx, '收盘'] = yesterday_close
+                                kept_rows = min(kept_rows, idx)
                                 print(f"已修正{last_trading_day.strftime('%Y-%m-%d')}收盘价: {old_close} → {yesterday_close}")
 
             # ========== 更新当天数据 ==========
@@ -619,14 +828,21 @@ def update_from_main_contract():
                 }
 
                 # 移除今天的旧数据（如果有）
-                df = df[df['日期'].dt.date != today]
-                # 添加今天的新数据
-                df = pd.concat([df, pd.DataFrame([today_row])], ignore_index=True)
-                df = df.sort_values('日期').reset_index(drop=True)
+                is_today = (df['日期'].dt.date == today).to_numpy()
+                if is_today.any():
+                    kept_rows = min(kept_rows, int(np.argmax(is_today)))
+                    df = df[~is_today].reset_index(drop=True)
+                # 添加今天的新数据（直接追加一行，不再构造临时DataFrame拼接）
+                df.loc[len(df)] = today_row
+                # 今天晚于已有数据时追加后仍然有序，无需重新排序
+                if not df['日期'].is_monotonic_increasing:
+                    df = df.sort_values('日期', kind='stable').reset_index(drop=True)
+                    kept_rows = 0
 
                 print(f"已更新今日{current_contract}实时数据: {realtime['price']}")
 
-            df.to_csv(file_path, index=False, encoding='utf-8-sig')
+            save_kline_csv(df, file_path, kept_rows=kept_rows, disk_rows=disk_rows, file_stat=file_stat)
+            save_parquet_mirror(df, file_path)
 
             # 构建详细反馈信息
             sources_text = ""
@@ -699,8 +915,9 @@ def check_data_status():
             'message': '数据文件不存在'
         }
 
-    df = pd.read_csv(file_path)
-    df['日期'] = pd.to_datetime(df['日期'])
+    # 只需要日期和合约两列
+    df = read_kline_csv(file_path, usecols=lambda col: col in ('日期', '合约'), parse_dates=['日期'],
+                     dtype={'合约': 'string'})
 
     latest_date = df['日期'].max()
     today = datetime.now().date()
@@ -6,12 +6,19 @@ IF300 数据更新改进版 V3 - 从前一天开始重新更新，确保数据
 
 import os
 import sys
+import concurrent.futures
+import numpy as np
 import pandas as pd
-import requests
 from datetime import datetime, timedelta
-import json
 import re
 
+# 可选：安装pyarrow后K线缓存保存为解析好的Arrow IPC文件
+try:
+    import pyarrow.feather as feather
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
 # 导入原有模块的必要函数
 from data_updater import (
     get_data_path,
@@ -19,9 +26,123 @@ from data_updater import (
     get_realtime_price,
     is_trading_time,
     _get_current_quarterly_contract,
-    get_delivery_date
+    get_delivery_date,
+    read_kline_csv,
+    read_kline_tail,
+    save_kline_csv,
+    save_parquet_mirror,
+    CSV_DTYPES,
+    json_loads,
+    _session
 )
 
+# get_sina_historical_klines 返回的列
+KLINE_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume']
+
+WEEKDAY_NAMES = ('周一', '周二', '周三', '周四', '周五', '周六', '周日')
+
+# 新浪K线响应的磁盘缓存目录，及交易时段内缓存的有效期（秒）
+KLINE_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.if300_cache')
+KLINE_CACHE_TTL = 300
+
+# 只读取数据文件末尾的行数（回溯更新最多涉及最后几行）
+TAIL_ROWS = 10
+
+# 新浪JSONP响应中的JSON数组部分
+_JSONP_RE = re.compile(rb'\((\[.*\])\)', re.DOTALL)
+
+
+def _last_session_end(now):
+    """最近一次交易时段结束（11:30午休或15:00收盘）的时间"""
+    for days in range(8):
+        day = (now - timedelta(days=days)).date()
+        if day.weekday() >= 5:
+            continue
+        for hour, minute in ((15, 1), (11, 31)):
+            session_end = datetime.combine(day, datetime.min.time()).replace(hour=hour, minute=minute)
+            if session_end <= now:
+                return session_end
+    return now
+
+
+def _kline_cache_path(contract):
+    """新浪K线缓存文件路径：安装pyarrow时为解析后的Arrow IPC文件，否则为JSON原文"""
+    ext = 'arrow' if HAS_ARROW else 'json'
+    return os.path.join(KLINE_CACHE_DIR, f'sina_{contract}_daily.{ext}')
+
+
+def _read_kline_cache(contract):
+    """读取缓存的新浪K线（DataFrame），已过期或不存在时返回None"""
+    cache_path = _kline_cache_path(contract)
+    try:
+        fetched_at = datetime.fromtimestamp(os.path.getmtime(cache_path))
+    except OSError:
+        return None
+
+    # 交易时段内短时间有效；休市期间只要是上个时段结束后获取的就仍然有效
+    now = datetime.now()
+    _, is_trading_hours, _ = is_trading_time()
+    if (now - fetched_at).total_seconds() >= KLINE_CACHE_TTL and \
+            (is_trading_hours or fetched_at < _last_session_end(now)):
+        return None
+
+    try:
+        if HAS_ARROW:
+            # 内存映射读取，无需再解析JSON
+            return feather.read_table(cache_path, memory_map=True).to_pandas()
+        with open(cache_path, 'rb') as f:
+            return _parse_klines(json_loads(f.read()))
+    except Exception as e:
+        print(f"读取K线缓存失败: {e}")
+        return None
+
+
+def _write_kline_cache(contract, payload, klines):
+    """保存新浪K线到磁盘缓存，文件修改时间即获取时间"""
+    try:
+        os.makedirs(KLINE_CACHE_DIR, exist_ok=True)
+        cache_path = _kline_cache_path(contract)
+        if HAS_ARROW:
+            feather.write_feather(klines, cache_path, compression='uncompressed')
+        else:
+            with open(cache_path, 'wb') as f:
+                f.write(payload)
+    except Exception as e:
+        print(f"写入K线缓存失败: {e}")
+
+
+def _parse_klines(data_list):
+    """将新浪K线列表整列转换为标准格式的DataFrame（只保留有日期的数据）"""
+    raw = pd.DataFrame(data_list)
+    if 'd' not in raw.columns:
+        return pd.DataFrame(columns=KLINE_COLUMNS)
+
+    raw = raw[raw['d'].fillna('') != '']
+    klines = pd.DataFrame({'date': pd.to_datetime(raw['d'])})
+    for column, key in [('open', 'o'), ('high', 'h'), ('low', 'l'), ('close', 'c'), ('volume', 'v')]:
+        klines[column] = pd.to_numeric(raw[key], errors='coerce').astype('float64') if key in raw.columns else 0.0
+    # 价格无法解析的K线丢弃，成交量缺失按0处理
+    klines = klines.dropna(subset=['open', 'high', 'low', 'close'])
+    klines['volume'] = klines['volume'].fillna(0).astype('int64')
+    return klines.reset_index(drop=True)
+
+
+def _read_if_data(file_path):
+    """
+    读取IF数据，返回 (df, 是否只读取了文件末尾)
+
+    末尾TAIL_ROWS行日期严格递增时只读取末尾，否则读取全部数据并按日期排序
+    """
+    df = read_kline_tail(file_path, TAIL_ROWS, encoding='utf-8-sig', parse_dates=['日期'], dtype=CSV_DTYPES)
+    if df is not None and df['日期'].is_monotonic_increasing and df['日期'].is_unique:
+        return df, True
+
+    # 安装pyarrow时优先读取parquet镜像，日期列无需再解析
+    df = read_kline_csv(file_path, encoding='utf-8-sig', parse_dates=['日期'], dtype=CSV_DTYPES)
+    if not df['日期'].is_monotonic_increasing:
+        df = df.sort_values('日期').reset_index(drop=True)
+    return df, False
+
 
 def get_sina_historical_klines(contract, days_back=60):
     """
@@ -31,7 +152,7 @@ def get_sina_historical_klines(contract, days_back=60):
         contract: 合约代码 (如 'IF2603')
         days_back: 回溯天数（获取最近N条K线）
 
-    返回: list of dict，包含 {'date', 'open', 'high', 'low', 'close', 'volume'}
+    返回: DataFrame，列为 date, open, high, low, close, volume；失败时返回空DataFrame
     """
     try:
         url = 'https://stock.finance.sina.com.cn/futures/api/jsonp.php/var%20_result=/InnerFuturesNewService.getDailyKLine'
@@ -44,39 +165,26 @@ def get_sina_historical_klines(contract, days_back=60):
             'User-Agent': 'Mozilla/5.0'
         }
 
-        resp = requests.get(url, params=params, headers=headers, timeout=10)
-        text = resp.text
-
-        # 解析 JSONP 响应: var _result=([...])
-        start = text.find('([')
-        end = text.rfind('])')
-        if start == -1 or end == -1:
-            return []
-
-        data_list = json.loads(text[start+1:end+1])
+        # 缓存仍有效时不再请求网络
+        klines = _read_kline_cache(contract)
+        if klines is None:
+            resp = _session.get(url, params=params, headers=headers, timeout=10)
 
-        if not data_list:
-            return []
+            # 解析 JSONP 响应: var _result=([...])，直接在字节上匹配，不解码整个响应
+            match = _JSONP_RE.search(resp.content)
+            if match is None:
+                return pd.DataFrame(columns=KLINE_COLUMNS)
+            payload = match.group(1)
+            klines = _parse_klines(json_loads(payload))
+            if not klines.empty:
+                _write_kline_cache(contract, payload, klines)
 
-        # 转换为标准格式，返回最近N条
-        klines = []
-        for item in data_list[-days_back:]:  # 获取最近days_back条
-            kline = {
-                'date': item.get('d', ''),
-                'open': float(item.get('o', 0)),
-                'high': float(item.get('h', 0)),
-                'low': float(item.get('l', 0)),
-                'close': float(item.get('c', 0)),
-                'volume': int(float(item.get('v', 0))),
-            }
-            if kline['date']:  # 只保留有日期的数据
-                klines.append(kline)
-
-        return klines
+        # 返回最近N条
+        return klines.iloc[-days_back:].reset_index(drop=True)
 
     except Exception as e:
         print(f"获取新浪历史K线失败: {e}")
-        return []
+        return pd.DataFrame(columns=KLINE_COLUMNS)
 
 
 def update_if_data_with_rollback():
@@ -102,38 +210,50 @@ def update_if_data_with_rollback():
         print("✗ 数据文件不存在")
         return
 
-    df = pd.read_csv(file_path)
-    df['日期'] = pd.to_datetime(df['日期'])
-    df = df.sort_values('日期').reset_index(drop=True)
+    # 合约只取决于当天日期，K线请求在后台线程发出，与读取CSV同时进行
+    contract = get_current_quarterly_contract()
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    klines_future = executor.submit(get_sina_historical_klines, contract, days_back=30)
+    executor.shutdown(wait=False)
+
+    file_stat = os.stat(file_path)
+    df, tail_only = _read_if_data(file_path)
+    # 合约列只有少数几个取值，用category节省内存；成交量/持仓量无损降为更窄的整数类型
+    # 价格列保持float64，float32写回CSV会带出多余的尾数
+    df['合约'] = df['合约'].astype('category')
+    for col in ('成交量', '持仓量'):
+        df[col] = pd.to_numeric(df[col], downcast='integer')
 
     last_date = df['日期'].max()
     print(f"✓ 数据最后日期：{last_date.strftime('%Y-%m-%d')}")
-    print(f"✓ 总记录数：{len(df)}")
+    if tail_only:
+        print(f"✓ 读取末尾 {len(df)} 条记录")
+    else:
+        print(f"✓ 总记录数：{len(df)}")
 
     # 第二步：获取回溯日期（从前一个交易日开始）
     print("\n【第二步】确定更新起点...")
 
-    # 获取前一个交易日（往前推，跳过周末）
-    rollback_date = last_date
-    for i in range(1, 10):
-        check_date = last_date - timedelta(days=i)
-        if check_date.weekday() < 5:  # 周一到周五
-            rollback_date = check_date
-            break
+    # 前一个交易日取数据中最后日期之前的最近一天（CSV只含交易日，节假日自然跳过）；
+    # 只有一天数据时按工作日往前推
+    earlier = df['日期'][df['日期'] < last_date]
+    if len(earlier) > 0:
+        rollback_date = earlier.iloc[-1]
+    else:
+        rollback_date = pd.Timestamp(np.busday_offset(last_date.date(), -1, roll='backward'))
 
-    print(f"最后数据日期：{last_date.strftime('%Y-%m-%d')}（{['周一', '周二', '周三', '周四', '周五', '周六', '周日'][last_date.weekday()]}）")
-    print(f"更新起点日期：{rollback_date.strftime('%Y-%m-%d')}（{['周一', '周二', '周三', '周四', '周五', '周六', '周日'][rollback_date.weekday()]}）")
-    print(f"将重新更新这 {(last_date - rollback_date).days + 1} 天的数据")
+    print(f"最后数据日期：{last_date.strftime('%Y-%m-%d')}（{WEEKDAY_NAMES[last_date.weekday()]}）")
+    print(f"更新起点日期：{rollback_date.strftime('%Y-%m-%d')}（{WEEKDAY_NAMES[rollback_date.weekday()]}）")
+    print(f"将重新更新这 {(df['日期'] >= rollback_date).sum()} 个交易日的数据")
 
     # 第三步：获取最新的K线数据
     print("\n【第三步】从新浪API获取最新K线数据...")
 
-    contract = get_current_quarterly_contract()
     print(f"当前合约：{contract}")
 
-    klines = get_sina_historical_klines(contract, days_back=30)
+    klines = klines_future.result()
 
-    if not klines:
+    if klines.empty:
         print("✗ 无法获取K线数据")
         return
 
@@ -142,44 +262,62 @@ def update_if_data_with_rollback():
     # 第四步：替换/补充数据
     print("\n【第四步】更新数据...")
 
+    # 只添加rollback_date之后的数据，整列改名为中文列名
+    df_new = klines[klines['date'] >= rollback_date].rename(columns={
+        'date': '日期',
+        'open': '开盘',
+        'high': '最高',
+        'low': '最低',
+        'close': '收盘',
+        'volume': '成交量'
+    }).assign(持仓量=0, 合约=contract)  # 新浪日K线不提供持仓量
+
+    # 新K线与现有数据完全一致时无需重写文件
+    columns = list(df_new.columns)
+    old_tail = df[df['日期'] >= rollback_date]
+    if len(df_new) > 0 and set(columns) <= set(df.columns) and \
+            old_tail[columns].astype(str).reset_index(drop=True).equals(
+                df_new.astype(str).reset_index(drop=True)):
+        print("✓ 数据无变化，无需保存")
+        print("\n" + "="*70)
+        print("✅ 数据已是最新！")
+        print("="*70)
+        return
+
     # 删除从rollback_date开始的所有数据
-    df = df[df['日期'] < rollback_date].copy()
+    disk_rows = len(df)
+    df = df[df['日期'] < rollback_date]
+    kept_rows = len(df)
     print(f"删除了从 {rollback_date.strftime('%Y-%m-%d')} 开始的数据")
-    print(f"保留 {len(df)} 条历史数据")
-
-    # 将新K线数据转换为DataFrame格式并添加
-    new_records = []
-    for kline in klines:
-        date = pd.to_datetime(kline['date'])
-        # 只添加rollback_date之后的数据
-        if date >= rollback_date:
-            new_records.append({
-                '日期': date,
-                '开盘': kline['open'],
-                '最高': kline['high'],
-                '最低': kline['low'],
-                '收盘': kline['close'],
-                '成交量': kline['volume'],
-                '持仓量': 0,  # 新浪日K线不提供持仓量
-                '合约': contract
-            })
-
-    if new_records:
-        df_new = pd.DataFrame(new_records)
+    print(f"保留 {len(df)} 条{'末尾' if tail_only else '历史'}数据")
+
+    if len(df_new) > 0:
+        # 保留部分已按日期排序且都早于rollback_date，只需整理新K线本身
+        if not df_new['日期'].is_monotonic_increasing or df_new['日期'].duplicated().any():
+            df_new = df_new.drop_duplicates(subset=['日期'], keep='last').sort_values('日期')
         df = pd.concat([df, df_new], ignore_index=True)
-        df = df.drop_duplicates(subset=['日期'], keep='last')
-        df = df.sort_values('日期').reset_index(drop=True)
-        print(f"✓ 添加/更新了 {len(new_records)} 条新数据")
+        print(f"✓ 添加/更新了 {len(df_new)} 条新数据")
     else:
         print("⚠ 新K线数据中没有符合条件的记录")
 
     # 第五步：保存数据
     print("\n【第五步】保存数据...")
 
-    df.to_csv(file_path, index=False, encoding='utf-8-sig')
+    if tail_only:
+        # 只改写文件末尾变化的行；parquet镜像随之过期，下次读取CSV时重建
+        try:
+            save_kline_csv(df, file_path, kept_rows=kept_rows, disk_rows=disk_rows,
+                           file_stat=file_stat, partial=True)
+        except ValueError as e:
+            print(f"✗ 保存失败：{e}，请重新运行")
+            return
+    else:
+        save_kline_csv(df, file_path)
+        save_parquet_mirror(df, file_path)
     print(f"✓ 数据已保存")
     print(f"  新的最后日期：{df['日期'].max().strftime('%Y-%m-%d')}")
-    print(f"  总记录数：{len(df)}")
+    if not tail_only:
+        print(f"  总记录数：{len(df)}")
 
     print("\n" + "="*70)
     print("✅ 数据更新完成！")
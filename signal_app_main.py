@@ -12,12 +12,28 @@
 
 import tkinter as tk
 from tkinter import ttk
+import concurrent.futures
 import warnings
 warnings.filterwarnings('ignore')
 
-# 导入两个策略的界面模块
-from strategy_if300 import IF300StrategyFrame
-from strategy_weekend import WeekendStrategyFrame
+
+# 策略模块在首次切换到对应标签页时才导入；导入写成显式import语句，
+# PyInstaller打包时才能找到策略模块及其依赖（pandas、matplotlib等）
+def load_if300_frame():
+    import strategy_if300
+    return strategy_if300.IF300StrategyFrame
+
+
+def load_weekend_frame():
+    import strategy_weekend
+    return strategy_weekend.WeekendStrategyFrame
+
+
+# 标签页：(属性名前缀, 导入界面类的函数, 标题)
+STRATEGY_TABS = [
+    ('if300', load_if300_frame, "  IF300 股指期货策略  "),
+    ('weekend', load_weekend_frame, "  周末效应 创业板ETF策略  "),
+]
 
 
 class MultiStrategyApp:
@@ -29,34 +45,66 @@ class MultiStrategyApp:
         self.root.geometry("1100x900")
         self.root.minsize(1000, 800)
 
+        # 两个策略共用的后台线程池，网络请求不在界面线程执行
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+
         # 创建主框架
         self.create_widgets()
 
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
     def create_widgets(self):
         """创建界面组件"""
         # 创建Notebook（标签页容器）
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
-        # 创建两个策略的Frame
-        self.if300_frame = ttk.Frame(self.notebook)
-        self.weekend_frame = ttk.Frame(self.notebook)
-
-        # 添加标签页
-        self.notebook.add(self.if300_frame, text="  IF300 股指期货策略  ")
-        self.notebook.add(self.weekend_frame, text="  周末效应 创业板ETF策略  ")
+        # 创建各策略的Frame并添加标签页，策略界面先用占位文字代替
+        self.strategies = [None] * len(STRATEGY_TABS)
+        self.placeholders = []
+        for name, _, title in STRATEGY_TABS:
+            frame = ttk.Frame(self.notebook)
+            self.notebook.add(frame, text=title)
+            setattr(self, f'{name}_frame', frame)
+            setattr(self, f'{name}_strategy', None)
 
-        # 初始化两个策略界面（完全独立）
-        self.if300_strategy = IF300StrategyFrame(self.if300_frame)
-        self.weekend_strategy = WeekendStrategyFrame(self.weekend_frame)
+            placeholder = ttk.Label(frame, text="正在加载策略...", font=('微软雅黑', 12))
+            placeholder.pack(expand=True)
+            self.placeholders.append(placeholder)
 
-        # 绑定标签切换事件
+        # 绑定标签切换事件，并创建当前标签页的策略界面
         self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        self.activate_tab(self.notebook.index('current'))
+
+    def activate_tab(self, index):
+        """首次切换到标签页时导入策略模块并创建界面（各策略完全独立），返回是否新建"""
+        if self.strategies[index] is not None:
+            return False
+
+        name, load_frame_class, _ = STRATEGY_TABS[index]
+        self.root.update_idletasks()  # 先显示占位文字
+        strategy_class = load_frame_class()
+        self.placeholders[index].destroy()
+
+        strategy = strategy_class(getattr(self, f'{name}_frame'), executor=self.executor)
+        self.strategies[index] = strategy
+        setattr(self, f'{name}_strategy', strategy)
+        return True
 
     def on_tab_changed(self, event):
-        """标签页切换事件"""
-        # 可以在这里处理标签切换时的逻辑
-        pass
+        """标签页切换事件：首次切换时创建策略界面，已在盘中取过实时行情的策略在后台刷新一次"""
+        index = self.notebook.index('current')
+        if self.activate_tab(index):
+            return
+
+        strategy = self.strategies[index]
+        if strategy.realtime_price is not None:
+            strategy.refresh_realtime()
+
+    def on_close(self):
+        """关闭窗口，不等待尚未完成的网络请求"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
 
 
 def main():
@@ -10,10 +10,13 @@ import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
 import sys
 import threading
+import functools
+import math
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -22,7 +25,7 @@ import matplotlib
 matplotlib.use('TkAgg')
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.patches import Rectangle
+from matplotlib.collections import LineCollection, PolyCollection
 import matplotlib.dates as mdates
 
 # 设置中文字体
@@ -56,7 +59,70 @@ SHORT_B_ONLY_MONTHS = [12]
 SHORT_B_HOLD_DAYS = 5
 SHORT_B_STOP_LOSS = 0.02
 
+# 此日期之前的数据只用于计算MA60（warmup期），不参与显示
+WARMUP_END = np.datetime64('2017-01-01')
+
 WEEKDAY_NAMES = ['周一', '周二', '周三', '周四', '周五', '周六', '周日']
+# 是否交割周的显示文字，按 False/True 取用
+DELIVERY_WEEK_TEXT = ('否', '是')
+
+# 已显示实时价格后，连续失败达到此次数才提示错误（偶发的网络错误不打断显示）
+REALTIME_FAIL_LIMIT = 3
+
+# 策略说明窗口显示的文本
+STRATEGY_INFO_TEXT = """
+================================================================================
+IF300 V10.14 - 综合最优版本（宽止损）
+================================================================================
+
+【版本说明】
+基于500K+大规模参数搜索发现的 #3 最优策略。
+采用宽止损策略，减少被洗出次数，获取更高的年均收益和累计收益。
+
+【历史表现】(2018-2025)
+- 平均年收益率: 135.8%
+- 最大回撤: -27.8%
+- 收益回撤比: 4.89
+- 8年累计净值: 483.5倍
+
+================================================================================
+【做多策略】
+================================================================================
+- 开仓日: 周三、周四（交割周周四除外）
+- MA60比率范围: 99% ~ 110%
+- 持仓天数: 3个交易日
+- 止损: 2.0%
+
+================================================================================
+【做空策略A】（非12月）
+================================================================================
+- 开仓日: 周一
+- MA60比率范围: 98% ~ 110%
+- 持仓天数: 4个交易日
+- 止损: 1.5%
+
+================================================================================
+【做空策略B】（仅12月）
+================================================================================
+- 开仓日: 周五
+- MA60比率范围: ≤100%
+- 持仓天数: 5个交易日
+- 止损: 2.0%
+================================================================================
+"""
+
+# K线悬停提示的最小刷新间隔（秒）
+HOVER_INTERVAL = 0.03
+
+# 可选：安装pyarrow后使用其多线程CSV解析器
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
+# CSV解析结果缓存 {文件路径: ((修改时间, 文件大小), DataFrame)}
+_csv_cache = {}
 
 
 def get_data_path():
@@ -71,48 +137,234 @@ def get_data_path():
     return data_path
 
 
+@functools.lru_cache(maxsize=8)
 def get_delivery_dates(start_year=2015, end_year=2030):
-    """生成季月合约交割日列表"""
-    delivery_dates = []
-    quarterly_months = [3, 6, 9, 12]
-    for year in range(start_year, end_year + 1):
-        for month in quarterly_months:
-            first_day = datetime(year, month, 1)
-            weekday = first_day.weekday()
-            if weekday <= 4:
-                first_friday = first_day + timedelta(days=(4 - weekday))
-            else:
-                first_friday = first_day + timedelta(days=(11 - weekday))
-            third_friday = first_friday + timedelta(days=14)
-            delivery_dates.append(pd.Timestamp(third_friday))
-    return delivery_dates
+    """生成季月合约交割日列表（结果缓存，返回tuple）"""
+    # 各年3、6、9、12月的月初（datetime64[M]以1970-01为0）
+    years = np.arange(start_year, end_year + 1)
+    months = ((years[:, None] - 1970) * 12 + np.array([2, 5, 8, 11])).ravel().astype('datetime64[M]')
+
+    # 第三个周五必在15~21日之间（1970-01-01为周四）
+    first_day = months.astype('datetime64[D]')
+    first_weekday = (first_day.astype(int) + 3) % 7
+    third_friday = first_day + 14 + (4 - first_weekday) % 7
+    return tuple(pd.DatetimeIndex(third_friday))
 
 
+@functools.lru_cache(maxsize=8)
+def get_delivery_week_days(delivery_dates):
+    """生成所有交割周日期的有序datetime64[D]数组（delivery_dates需为tuple，结果只读）"""
+    fridays = np.array(delivery_dates, dtype='datetime64[D]')
+    days = np.unique((fridays[:, None] - np.arange(4, -1, -1)).ravel())
+    days.flags.writeable = False
+    return days
+
+
+@functools.lru_cache(maxsize=8)
 def get_delivery_week_dates(delivery_dates):
-    """生成所有交割周日期的集合"""
-    delivery_week_set = set()
-    for dd in delivery_dates:
-        monday = dd - timedelta(days=4)
-        for i in range(5):
-            day = monday + timedelta(days=i)
-            delivery_week_set.add(day)
-    return delivery_week_set
+    """生成所有交割周日期的集合（delivery_dates需为tuple，返回日期序数toordinal()的frozenset）"""
+    # datetime64[D]以1970-01-01为0，其toordinal()为719163
+    days = get_delivery_week_days(delivery_dates)
+    return frozenset((days.astype(np.int64) + 719163).tolist())
+
+
+def infer_quarterly_contracts(dates):
+    """根据日期批量推断季月合约代码（向量化，交割日当天仍归属当季合约）"""
+    days = np.asarray(dates, dtype='datetime64[D]')
+    months = days.astype('datetime64[M]')
+    year = months.astype('datetime64[Y]').astype(int) + 1970
+    month = months.astype(int) % 12 + 1
+    qm = (month + 2) // 3 * 3
+
+    # 当季月第三个周五（1970-01-01为周四）
+    first_day = (months + (qm - month)).astype('datetime64[D]')
+    first_weekday = (first_day.astype(int) + 3) % 7
+    third_friday = first_day + 14 + (4 - first_weekday) % 7
+
+    # 已过交割日则切换到下一季月，12月之后为下一年3月
+    qm = np.where(days > third_friday, qm + 3, qm)
+    year = np.where(qm > 12, year + 1, year)
+    qm = np.where(qm > 12, 3, qm)
+
+    codes = ((year % 100) * 100 + qm).astype(str)
+    return np.char.add('IF', np.char.zfill(codes, 4))
+
+
+def rolling_mean(values, window):
+    """滚动均值（累加和实现，窗口内有缺失值或数据不足时为NaN）"""
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), np.nan)
+    if len(values) < window:
+        return out
+    valid = ~np.isnan(values)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    ccnt = np.concatenate(([0], np.cumsum(valid)))
+    sums = csum[window:] - csum[:-window]
+    counts = ccnt[window:] - ccnt[:-window]
+    out[window - 1:] = np.where(counts == window, sums / window, np.nan)
+    return out
+
+
+def _bar_verts(x, bottom, top, width):
+    """批量生成矩形顶点 (n, 4, 2)，用于PolyCollection"""
+    verts = np.empty((len(x), 4, 2))
+    verts[:, 0, 0] = verts[:, 3, 0] = x - width / 2
+    verts[:, 1, 0] = verts[:, 2, 0] = x + width / 2
+    verts[:, 0, 1] = verts[:, 1, 1] = bottom
+    verts[:, 2, 1] = verts[:, 3, 1] = top
+    return verts
+
+
+@functools.lru_cache(maxsize=32)
+def format_price_range(ma60, month):
+    """根据MA60和月份生成可开仓价格区间文本，返回 (做多区间, 做空区间)"""
+    long_text = f"{ma60 * LONG_MA_MIN:.2f} ~ {ma60 * LONG_MA_MAX:.2f}"
+    if month == 12:
+        short_text = f"≤ {ma60 * SHORT_B_MA_MAX:.2f}"
+    else:
+        short_text = f"{ma60 * SHORT_A_MA_MIN:.2f} ~ {ma60 * SHORT_A_MA_MAX:.2f}"
+    return long_text, short_text
+
+
+@functools.lru_cache(maxsize=64)
+def compute_calendar_signal(weekday, month, is_delivery_week):
+    """
+    计算与MA无关的开仓条件（星期、交割周），组合有限，结果缓存
+
+    返回: (做多星期, 做多交割周, 做空星期)
+    """
+    long_weekday_ok = weekday in LONG_WEEKDAYS
+    long_delivery_ok = not (is_delivery_week and weekday == 3)
+    if month == 12:
+        short_weekday_ok = weekday in SHORT_B_WEEKDAYS
+    else:
+        short_weekday_ok = weekday in SHORT_A_WEEKDAYS
+    return long_weekday_ok, long_delivery_ok, short_weekday_ok
+
+
+def compute_signal(weekday, month, is_delivery_week, ratio):
+    """
+    计算各开仓条件是否满足（MA比率按原值与阈值比较，不经缓存）
+
+    返回: (做多星期, 做多MA, 做多交割周, 做空星期, 做空MA)
+    """
+    long_weekday_ok, long_delivery_ok, short_weekday_ok = compute_calendar_signal(
+        weekday, month, is_delivery_week)
+    long_ma_ok = LONG_MA_MIN <= ratio <= LONG_MA_MAX
+    if month == 12:
+        short_ma_ok = ratio <= SHORT_B_MA_MAX
+    else:
+        short_ma_ok = SHORT_A_MA_MIN <= ratio <= SHORT_A_MA_MAX
+
+    return long_weekday_ok, long_ma_ok, long_delivery_ok, short_weekday_ok, short_ma_ok
+
+
+def read_csv_cached(file_path):
+    """读取CSV文件（列名去空格、日期列已解析），文件未变化时复用上次的解析结果（返回副本）"""
+    stat = os.stat(file_path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _csv_cache.get(file_path)
+    if cached is None or cached[0] != key:
+        df = pd.read_csv(file_path, encoding='utf-8-sig', engine=CSV_ENGINE)
+        df.columns = df.columns.str.strip()
+        if '日期' in df.columns:
+            df['日期'] = pd.to_datetime(df['日期'])
+        cached = (key, df)
+        _csv_cache[file_path] = cached
+    return cached[1].copy()
+
+
+def stack_columns(top, bottom, columns):
+    """按列纵向拼接两个DataFrame（每列只分配一次，代替pd.concat整表复制）"""
+    return pd.DataFrame({col: np.concatenate([top[col].to_numpy(), bottom[col].to_numpy()])
+                         for col in columns})
+
+
+def read_if_data(data_path, file_path):
+    """读取并预处理IF季月合约K线数据（不涉及界面，可在后台线程调用）"""
+    from data_updater import normalize_price_columns
+
+    # 获取价格数据
+    df_if = normalize_price_columns(read_csv_cached(file_path))
+
+    # 确保有合约列
+    if '合约' not in df_if.columns:
+        df_if['合约'] = ''
+
+    # 尝试加载沪深300指数数据补充早期数据
+    idx_file = os.path.join(data_path, 'IF_主连_沪深300股指期货_day.csv')
+    if os.path.exists(idx_file):
+        try:
+            df_idx = normalize_price_columns(read_csv_cached(idx_file))
+
+            if '合约' not in df_idx.columns:
+                df_idx['合约'] = 'IF主连'
+
+            min_date = df_if['日期'].min()
+            df_idx = df_idx[df_idx['日期'] < min_date]
+
+            if len(df_idx) > 0:
+                df_if = stack_columns(df_idx, df_if, ['日期', '开盘', '最高', '最低', '收盘', '合约'])
+        except:
+            pass
+
+    # 拼接后通常已按日期排好序，乱序时才用稳定排序
+    if not df_if['日期'].is_monotonic_increasing:
+        df_if = df_if.sort_values('日期', kind='mergesort').reset_index(drop=True)
+
+    # 填充空的合约列
+    mask = df_if['合约'].isna() | (df_if['合约'] == '')
+    if mask.any():
+        df_if.loc[mask, '合约'] = infer_quarterly_contracts(df_if.loc[mask, '日期'].to_numpy())
+
+    # 计算时间特征
+    df_if['weekday'] = df_if['日期'].dt.weekday
+    df_if['month'] = df_if['日期'].dt.month
+
+    df_if['MA60'] = rolling_mean(df_if['收盘'].to_numpy(), 60)
+
+    # 只保留界面用到的列，并压缩数据类型
+    df_if = df_if[['日期', '开盘', '最高', '最低', '收盘', '合约', 'weekday', 'month', 'MA60']]
+    df_if = df_if.astype({'开盘': 'float32', '最高': 'float32', '最低': 'float32', '收盘': 'float32',
+                          '合约': 'category', 'weekday': 'int8', 'month': 'int8'})
+
+    return df_if
 
 
 class IF300StrategyFrame:
     """IF300策略界面模块"""
 
-    def __init__(self, parent):
+    def __init__(self, parent, executor=None):
         self.parent = parent
         self.root = parent.winfo_toplevel()
+        # 后台线程池（由主程序共享），未提供时每次单独起线程
+        self.executor = executor
 
         # 数据变量
         self.df = None
+        self.live_df = None
+        self.live_dates = None
+        self.warmup_end = 0
+        self.latest_ma60 = None
+        self.data_ready = False
+        self.load_thread = None
+        self.reload_pending = False  # 加载进行中又请求了加载（如数据更新后），完成后需再读一次
+        self.update_thread = None
         self.delivery_dates = get_delivery_dates()
         self.delivery_week_set = get_delivery_week_dates(self.delivery_dates)
+        self.delivery_week_days = get_delivery_week_days(self.delivery_dates)
+
+        # 界面显示缓存
+        self.price_range_key = None
+        self.info_window = None
 
         # 实时行情相关
         self.realtime_price = None
+        self.realtime_pending = False
+        self.realtime_failures = 0
+        self.realtime_display_pending = False
+        self.realtime_received = None
+        self.realtime_render_key = None
         self.auto_refresh_id = None
         self.auto_refresh_enabled = True
 
@@ -258,9 +510,16 @@ class IF300StrategyFrame:
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
         self.kline_data = None
+        self.kline_arrays = None
+        self.chart_sig = None
         self.hover_annotation = None
         self.hover_vline = None
+        self.chart_background = None
+        self.last_hover_idx = None
+        self.last_hover_time = 0.0
+        self.pending_hover = None
         self.canvas.mpl_connect('motion_notify_event', self.on_mouse_move)
+        self.canvas.mpl_connect('draw_event', self.on_chart_draw)
 
         # ===== 底部状态栏 =====
         status_frame = ttk.Frame(main_frame)
@@ -272,98 +531,51 @@ class IF300StrategyFrame:
         ttk.Button(status_frame, text="策略说明", command=self.show_strategy_info).pack(side=tk.RIGHT)
 
     def load_data(self):
-        """加载K线数据"""
+        """加载K线数据（后台线程读取，完成后回到主线程更新界面）"""
+        if self.load_thread is not None and self.load_thread.is_alive():
+            # 正在读取的可能是更新前的文件，记下来等这次加载结束后重新读取
+            self.reload_pending = True
+            return
+
         self.status_var.set("正在加载数据...")
+        data_path = get_data_path()
+        file_path = os.path.join(data_path, 'IF_主连_季月合约连接_day.csv')
+
+        if not os.path.exists(file_path):
+            messagebox.showerror("错误", f"数据文件不存在:\n{file_path}")
+            self.status_var.set("数据加载失败")
+            return
+
+        def do_load():
+            try:
+                df = read_if_data(data_path, file_path)
+                self.parent.after(0, self.on_load_complete, df)
+            except Exception as e:
+                self.parent.after(0, self.on_load_error, str(e))
+
+        self.load_thread = threading.Thread(target=do_load, daemon=True)
+        self.load_thread.start()
+
+    def on_load_complete(self, df):
+        """数据加载完成回调"""
         try:
-            data_path = get_data_path()
-            file_path = os.path.join(data_path, 'IF_主连_季月合约连接_day.csv')
-
-            if not os.path.exists(file_path):
-                messagebox.showerror("错误", f"数据文件不存在:\n{file_path}")
-                self.status_var.set("数据加载失败")
-                return
-
-            df_if = pd.read_csv(file_path, encoding='utf-8-sig')
-            df_if.columns = df_if.columns.str.strip()
-            df_if['日期'] = pd.to_datetime(df_if['日期'])
-
-            # 获取价格数据
-            for old_col, new_col in [('开盘价', '开盘'), ('最高价', '最高'), ('最低价', '最低'), ('收盘价', '收盘')]:
-                if old_col in df_if.columns:
-                    if new_col not in df_if.columns:
-                        df_if[new_col] = df_if[old_col]
-                    else:
-                        mask = df_if[new_col].isna()
-                        df_if.loc[mask, new_col] = df_if.loc[mask, old_col]
-
-            # 尝试加载沪深300指数数据补充早期数据
-            idx_file = os.path.join(data_path, 'IF_主连_沪深300股指期货_day.csv')
-            if os.path.exists(idx_file):
-                try:
-                    df_idx = pd.read_csv(idx_file, encoding='utf-8-sig')
-                    df_idx.columns = df_idx.columns.str.strip()
-                    df_idx['日期'] = pd.to_datetime(df_idx['日期'])
-
-                    for old_col, new_col in [('开盘价', '开盘'), ('最高价', '最高'), ('最低价', '最低'), ('收盘价', '收盘')]:
-                        if old_col in df_idx.columns and new_col not in df_idx.columns:
-                            df_idx[new_col] = df_idx[old_col]
-
-                    if '合约' not in df_idx.columns:
-                        df_idx['合约'] = 'IF主连'
-
-                    min_date = df_if['日期'].min()
-                    df_idx = df_idx[df_idx['日期'] < min_date]
-
-                    if len(df_idx) > 0:
-                        df_if = pd.concat([df_idx, df_if], ignore_index=True)
-                except:
-                    pass
-
-            df_if = df_if.sort_values('日期').reset_index(drop=True)
-
-            # 确保有合约列，并填充空值
-            if '合约' not in df_if.columns:
-                df_if['合约'] = ''
-
-            # 根据日期推断季月合约代码（填充空值）
-            def infer_quarterly_contract(date):
-                year = date.year
-                month = date.month
-                quarterly_months = [3, 6, 9, 12]
-                for qm in quarterly_months:
-                    if qm >= month:
-                        # 计算该季月的交割日（第三个周五）
-                        first_day = datetime(year, qm, 1)
-                        wd = first_day.weekday()
-                        if wd <= 4:
-                            first_fri = first_day + timedelta(days=(4 - wd))
-                        else:
-                            first_fri = first_day + timedelta(days=(11 - wd))
-                        third_fri = first_fri + timedelta(days=14)
-                        if date.date() <= third_fri.date():
-                            return f"IF{year % 100:02d}{qm:02d}"
-                # 下一年3月
-                return f"IF{(year + 1) % 100:02d}03"
-
-            # 填充空的合约列
-            mask = df_if['合约'].isna() | (df_if['合约'] == '')
-            if mask.any():
-                df_if.loc[mask, '合约'] = df_if.loc[mask, '日期'].apply(infer_quarterly_contract)
-
-            # 标记warmup期
-            df_if['is_warmup'] = df_if['日期'] < pd.to_datetime('2017-01-01')
-
-            # 计算时间特征
-            df_if['weekday'] = df_if['日期'].dt.weekday
-            df_if['month'] = df_if['日期'].dt.month
-
-            self.df = df_if
-            self.df['MA60'] = self.df['收盘'].rolling(60).mean()
+            self.data_ready = False
+            self.df = df
+            # 数据按日期排序，warmup期是开头连续的一段，按下标切出之后的部分供各显示函数复用
+            self.warmup_end = int(np.searchsorted(df['日期'].to_numpy(), WARMUP_END))
+            self.live_df = df.iloc[self.warmup_end:].reset_index(drop=True)
+            # 日期文本（YYYY-MM-DD）只生成一次，K线图刻度和悬停提示直接取用
+            self.live_dates = np.datetime_as_string(self.live_df['日期'].to_numpy(), unit='D')
+            # 最新一根K线的MA60只在重新加载数据时变化，实时行情刷新直接使用（数据不足时为None）
+            latest_ma60 = float(self.live_df['MA60'].iat[-1])
+            self.latest_ma60 = latest_ma60 if not math.isnan(latest_ma60) else None
+            # 以上缓存都已就绪，各显示函数只需检查这个标志
+            self.data_ready = True
 
             # 更新界面
             self.update_display()
 
-            data_start = self.df[self.df['is_warmup'] == False]['日期'].min().strftime('%Y-%m-%d')
+            data_start = self.live_dates[0]
             data_end = self.df['日期'].max().strftime('%Y-%m-%d')
             self.status_var.set(f"数据加载完成 | 数据范围: {data_start} ~ {data_end}")
 
@@ -371,35 +583,62 @@ class IF300StrategyFrame:
             self.refresh_time_var.set(f"数据更新: {now}")
 
         except Exception as e:
-            messagebox.showerror("错误", f"加载数据失败:\n{str(e)}")
-            self.status_var.set("数据加载失败")
+            self.on_load_error(str(e))
+            return
+
+        self.reload_if_pending()
+
+    def on_load_error(self, error):
+        """数据加载错误回调"""
+        messagebox.showerror("错误", f"加载数据失败:\n{error}")
+        self.status_var.set("数据加载失败")
+        self.reload_if_pending()
+
+    def reload_if_pending(self):
+        """加载期间有新的加载请求时，再加载一次最新数据"""
+        if self.reload_pending:
+            self.reload_pending = False
+            # 回调已回到主线程，读取线程的工作已经结束
+            self.load_thread = None
+            self.load_data()
+
+    def set_var(self, var, value):
+        """值有变化时才写入StringVar，避免无效的Tk刷新"""
+        if var.get() != value:
+            var.set(value)
+
+    def set_color(self, label, color):
+        """前景色有变化时才重新设置"""
+        if str(label.cget('foreground')) != color:
+            label.configure(foreground=color)
 
     def update_display(self):
         """更新界面显示"""
-        if self.df is None or len(self.df) == 0:
+        if not self.data_ready:
             return
 
-        latest = self.df[self.df['is_warmup'] == False].iloc[-1]
+        self.realtime_render_key = None  # 信号区改为按收盘价显示，下次实时行情需重新刷新
+        latest = self.live_df.iloc[-1]
         current_date = datetime.now()  # 改为显示今天日期，而不是数据的最后日期
         price = latest['收盘']
         ma60 = latest['MA60']
         weekday = current_date.weekday()  # 改为用今天的weekday
         month = current_date.month  # 改为用今天的month
 
-        self.date_var.set(current_date.strftime('%Y-%m-%d'))
-        self.weekday_var.set(WEEKDAY_NAMES[weekday])
-        self.price_var.set(f"{price:.2f}")
-        self.ma60_var.set(f"{ma60:.2f}" if not pd.isna(ma60) else "--")
+        self.set_var(self.date_var, current_date.strftime('%Y-%m-%d'))
+        self.set_var(self.weekday_var, WEEKDAY_NAMES[weekday])
+        self.set_var(self.price_var, f"{price:.2f}")
+        self.set_var(self.ma60_var, f"{ma60:.2f}" if not pd.isna(ma60) else "--")
 
         if not pd.isna(ma60):
             ratio = price / ma60
-            self.ratio_var.set(f"{ratio:.4f} ({ratio*100:.2f}%)")
+            self.set_var(self.ratio_var, f"{ratio:.4f} ({ratio*100:.2f}%)")
         else:
             ratio = None
-            self.ratio_var.set("--")
+            self.set_var(self.ratio_var, "--")
 
-        is_delivery_week = current_date in self.delivery_week_set
-        self.delivery_var.set("是" if is_delivery_week else "否")
+        is_delivery_week = current_date.toordinal() in self.delivery_week_set
+        self.set_var(self.delivery_var, DELIVERY_WEEK_TEXT[is_delivery_week])
 
         self.analyze_signal(current_date, price, ma60, weekday, month, is_delivery_week)
         self.update_price_range(month)
@@ -408,159 +647,159 @@ class IF300StrategyFrame:
     def analyze_signal(self, current_date, price, ma60, weekday, month, is_delivery_week):
         """分析交易信号"""
         if pd.isna(ma60):
-            self.long_weekday_var.set("MA60数据不足")
-            self.long_ma_var.set("")
-            self.long_delivery_var.set("")
-            self.short_weekday_var.set("MA60数据不足")
-            self.short_month_var.set("")
-            self.short_ma_var.set("")
+            self.set_var(self.long_weekday_var, "MA60数据不足")
+            self.set_var(self.long_ma_var, "")
+            self.set_var(self.long_delivery_var, "")
+            self.set_var(self.short_weekday_var, "MA60数据不足")
+            self.set_var(self.short_month_var, "")
+            self.set_var(self.short_ma_var, "")
             return
 
         ratio = price / ma60
+        (long_weekday_ok, long_ma_ok, long_delivery_ok,
+         short_weekday_ok, short_ma_ok) = compute_signal(weekday, month, bool(is_delivery_week), ratio)
 
         # ===== 做多条件分析 =====
-        long_weekday_ok = weekday in LONG_WEEKDAYS
         weekday_text = f"星期: {WEEKDAY_NAMES[weekday]} (需要周三/周四)"
-        self.long_weekday_var.set(weekday_text)
-        self.long_weekday_label.configure(foreground='green' if long_weekday_ok else 'red')
+        self.set_var(self.long_weekday_var, weekday_text)
+        self.set_color(self.long_weekday_label, 'green' if long_weekday_ok else 'red')
 
-        long_ma_ok = LONG_MA_MIN <= ratio <= LONG_MA_MAX
         ma_text = f"MA比率: {ratio:.4f} (需要{LONG_MA_MIN}~{LONG_MA_MAX})"
-        self.long_ma_var.set(ma_text)
-        self.long_ma_label.configure(foreground='green' if long_ma_ok else 'red')
+        self.set_var(self.long_ma_var, ma_text)
+        self.set_color(self.long_ma_label, 'green' if long_ma_ok else 'red')
 
-        long_delivery_ok = not (is_delivery_week and weekday == 3)
         delivery_text = f"交割周周四: {'是(不可开仓)' if not long_delivery_ok else '否'}"
-        self.long_delivery_var.set(delivery_text)
-        self.long_delivery_label.configure(foreground='green' if long_delivery_ok else 'red')
+        self.set_var(self.long_delivery_var, delivery_text)
+        self.set_color(self.long_delivery_label, 'green' if long_delivery_ok else 'red')
 
         long_signal = long_weekday_ok and long_ma_ok and long_delivery_ok
         if long_signal:
-            self.long_result_var.set("✓ 满足做多条件")
-            self.long_result_label.configure(foreground='green')
+            self.set_var(self.long_result_var, "✓ 满足做多条件")
+            self.set_color(self.long_result_label, 'green')
         else:
-            self.long_result_var.set("✗ 不满足做多条件")
-            self.long_result_label.configure(foreground='gray')
+            self.set_var(self.long_result_var, "✗ 不满足做多条件")
+            self.set_color(self.long_result_label, 'gray')
 
         # ===== 做空条件分析 =====
         if month == 12:
-            short_weekday_ok = weekday in SHORT_B_WEEKDAYS
             weekday_text = f"星期: {WEEKDAY_NAMES[weekday]} (12月需要周五)"
-            short_ma_ok = ratio <= SHORT_B_MA_MAX
             ma_text = f"MA比率: {ratio:.4f} (需要≤{SHORT_B_MA_MAX})"
         else:
-            short_weekday_ok = weekday in SHORT_A_WEEKDAYS
             weekday_text = f"星期: {WEEKDAY_NAMES[weekday]} (非12月需要周一)"
-            short_ma_ok = SHORT_A_MA_MIN <= ratio <= SHORT_A_MA_MAX
             ma_text = f"MA比率: {ratio:.4f} (需要{SHORT_A_MA_MIN}~{SHORT_A_MA_MAX})"
 
-        self.short_weekday_var.set(weekday_text)
-        self.short_weekday_label.configure(foreground='green' if short_weekday_ok else 'red')
+        self.set_var(self.short_weekday_var, weekday_text)
+        self.set_color(self.short_weekday_label, 'green' if short_weekday_ok else 'red')
 
         month_text = f"月份: {month}月 ({'12月策略B' if month == 12 else '非12月策略A'})"
-        self.short_month_var.set(month_text)
-        self.short_month_label.configure(foreground='blue')
+        self.set_var(self.short_month_var, month_text)
+        self.set_color(self.short_month_label, 'blue')
 
-        self.short_ma_var.set(ma_text)
-        self.short_ma_label.configure(foreground='green' if short_ma_ok else 'red')
+        self.set_var(self.short_ma_var, ma_text)
+        self.set_color(self.short_ma_label, 'green' if short_ma_ok else 'red')
 
         short_signal = short_weekday_ok and short_ma_ok
         if short_signal:
-            self.short_result_var.set("✓ 满足做空条件")
-            self.short_result_label.configure(foreground='red')
+            self.set_var(self.short_result_var, "✓ 满足做空条件")
+            self.set_color(self.short_result_label, 'red')
         else:
-            self.short_result_var.set("✗ 不满足做空条件")
-            self.short_result_label.configure(foreground='gray')
+            self.set_var(self.short_result_var, "✗ 不满足做空条件")
+            self.set_color(self.short_result_label, 'gray')
 
     def update_price_range(self, month):
         """计算并更新可开仓价格区间"""
-        if self.df is None or len(self.df) == 0:
+        if not self.data_ready:
             return
 
-        latest = self.df[self.df['is_warmup'] == False].iloc[-1]
-        ma60 = latest['MA60']
+        ma60 = self.latest_ma60
 
-        if pd.isna(ma60):
+        if ma60 is None:
+            self.price_range_key = None
             self.long_price_range_var.set("MA60数据不足")
             self.short_price_range_var.set("MA60数据不足")
             return
 
-        long_min = ma60 * LONG_MA_MIN
-        long_max = ma60 * LONG_MA_MAX
-        self.long_price_range_var.set(f"{long_min:.2f} ~ {long_max:.2f}")
+        # MA60和月份未变化时无需更新
+        range_key = (ma60, month)
+        if range_key == self.price_range_key:
+            return
+        self.price_range_key = range_key
 
-        if month == 12:
-            short_max = ma60 * SHORT_B_MA_MAX
-            self.short_price_range_var.set(f"≤ {short_max:.2f}")
-        else:
-            short_min = ma60 * SHORT_A_MA_MIN
-            short_max = ma60 * SHORT_A_MA_MAX
-            self.short_price_range_var.set(f"{short_min:.2f} ~ {short_max:.2f}")
+        long_text, short_text = format_price_range(*range_key)
+        self.long_price_range_var.set(long_text)
+        self.short_price_range_var.set(short_text)
 
     def update_kline_chart(self):
         """更新K线图"""
-        if self.df is None or len(self.df) == 0:
+        if not self.data_ready:
+            return
+
+        display_df = self.live_df.tail(120).reset_index(drop=True)
+        date_strs = self.live_dates[-len(display_df):]
+
+        x = np.arange(len(display_df))
+        opens = display_df['开盘'].to_numpy(dtype=float)
+        highs = display_df['最高'].to_numpy(dtype=float)
+        lows = display_df['最低'].to_numpy(dtype=float)
+        closes = display_df['收盘'].to_numpy(dtype=float)
+        dates = display_df['日期']
+        weekdays = display_df['weekday'].to_numpy()
+        ma60 = display_df['MA60'].to_numpy(dtype=float) if 'MA60' in display_df.columns else None
+
+        # 显示的数据未变化时跳过重绘
+        chart_sig = (dates.to_numpy().tobytes(), np.stack([opens, highs, lows, closes]).tobytes(),
+                     ma60.tobytes() if ma60 is not None else None,
+                     tuple(display_df['合约']) if '合约' in display_df.columns else None)
+        if chart_sig == self.chart_sig:
             return
+        self.chart_sig = chart_sig
 
+        self.chart_background = None
         self.ax.clear()
-        display_df = self.df[self.df['is_warmup'] == False].tail(120).copy()
-        display_df = display_df.reset_index(drop=True)
         self.kline_data = display_df
+        # 悬停提示按下标直接读取的列数组，避免每次移动鼠标都构造一行Series
+        self.kline_arrays = {
+            '日期': date_strs, '星期': weekdays, '开盘': opens, '最高': highs, '最低': lows, '收盘': closes,
+            '合约': display_df['合约'].to_numpy() if '合约' in display_df.columns else None,
+            'MA60': ma60,
+        }
 
         # 获取价格范围用于绘制标记
-        price_min = display_df['最低'].min()
-        price_max = display_df['最高'].max()
+        price_min = np.nanmin(lows)
+        price_max = np.nanmax(highs)
         price_range = price_max - price_min
 
-        # 绘制K线
+        # 绘制K线（影线和实体各用一个集合批量绘制）
         width = 0.6
-        for idx, row in display_df.iterrows():
-            open_p = row['开盘']
-            close_p = row['收盘']
-            high_p = row['最高']
-            low_p = row['最低']
-
-            # 确定颜色：涨红跌绿
-            if close_p >= open_p:
-                color = 'red'
-                body_bottom = open_p
-                body_height = close_p - open_p
-            else:
-                color = 'green'
-                body_bottom = close_p
-                body_height = open_p - close_p
 
-            # 绘制影线
-            self.ax.plot([idx, idx], [low_p, high_p], color=color, linewidth=1)
+        # 确定颜色：涨红跌绿
+        colors = np.where(closes >= opens, 'red', 'green')
+
+        # 绘制影线
+        wicks = np.stack([np.column_stack([x, lows]), np.column_stack([x, highs])], axis=1)
+        self.ax.add_collection(LineCollection(wicks, colors=colors, linewidths=1))
 
-            # 绘制实体
-            rect = Rectangle((idx - width/2, body_bottom), width, body_height if body_height > 0 else 0.1,
-                            facecolor=color, edgecolor=color, linewidth=1)
-            self.ax.add_patch(rect)
+        # 绘制实体
+        body_bottom = np.minimum(opens, closes)
+        body_height = np.abs(closes - opens)
+        body_top = body_bottom + np.where(body_height > 0, body_height, 0.1)
+        self.ax.add_collection(PolyCollection(_bar_verts(x, body_bottom, body_top, width),
+                                              facecolors=colors, edgecolors=colors, linewidths=1))
 
         # 绘制MA60均线
-        if 'MA60' in display_df.columns:
-            ma60_data = display_df['MA60'].dropna()
-            if len(ma60_data) > 0:
-                ma60_indices = display_df.loc[ma60_data.index].index.tolist()
-                self.ax.plot(ma60_indices, ma60_data.values, color='blue', linewidth=1.5, label='MA60')
+        if ma60 is not None:
+            ma60_mask = ~np.isnan(ma60)
+            if ma60_mask.any():
+                self.ax.plot(x[ma60_mask], ma60[ma60_mask], color='blue', linewidth=1.5, label='MA60')
 
         # 绘制合约分割线和标注合约名称
         if '合约' in display_df.columns:
-            contracts = display_df['合约'].tolist()
-            contract_ranges = []
-            current_contract = contracts[0] if contracts else ''
-            start_idx = 0
-
-            for i, contract in enumerate(contracts):
-                if contract != current_contract and contract != '':
-                    if current_contract:
-                        contract_ranges.append((start_idx, i - 1, current_contract))
-                    start_idx = i
-                    current_contract = contract
-
-            if current_contract:
-                contract_ranges.append((start_idx, len(contracts) - 1, current_contract))
+            # read_if_data已填充所有空合约，只需找出合约变化点
+            contracts = display_df['合约'].astype(str).to_numpy()
+            changes = np.flatnonzero(contracts[1:] != contracts[:-1]) + 1
+            starts = np.r_[0, changes]
+            ends = np.r_[changes - 1, len(contracts) - 1]
+            contract_ranges = [(start, end, contracts[start]) for start, end in zip(starts, ends) if contracts[start]]
 
             # 标注合约名称
             for start, end, contract in contract_ranges:
@@ -569,26 +808,29 @@ class IF300StrategyFrame:
                             fontsize=9, color='purple', ha='center', va='bottom', fontweight='bold')
 
         # 绘制交割周黄色背景
-        for i, row in display_df.iterrows():
-            date = row['日期']
-            if date in self.delivery_week_set:
-                rect = Rectangle((i - 0.5, price_min - price_range * 0.02),
-                                1, price_range * 1.04,
-                                facecolor='yellow', alpha=0.15, edgecolor='orange',
-                                linestyle='--', linewidth=0.5)
-                self.ax.add_patch(rect)
-
-        # 在K线下方显示星期几
+        delivery_mask = np.isin(dates.to_numpy().astype('datetime64[D]'), self.delivery_week_days)
+        if delivery_mask.any():
+            shade_x = x[delivery_mask]
+            shading = PolyCollection(_bar_verts(shade_x, price_min - price_range * 0.02,
+                                                price_max + price_range * 0.02, 1),
+                                     facecolors='yellow', alpha=0.15, edgecolors='orange',
+                                     linestyles='--', linewidths=0.5)
+            self.ax.add_collection(shading)
+
+        # 在K线下方显示星期几（用一条辅助X轴代替逐根K线的文字）
+        y_low = price_min - price_range * 0.08
+        y_high = price_max + price_range * 0.1
+        weekday_y = price_min - price_range * 0.03
         weekday_chars = ['一', '二', '三', '四', '五', '六', '日']
-        for i, row in display_df.iterrows():
-            wd = row['weekday']
-            self.ax.text(i, price_min - price_range * 0.03, weekday_chars[wd],
-                        fontsize=7, color='gray', ha='center', va='top')
+        weekday_axis = self.ax.secondary_xaxis((weekday_y - y_low) / (y_high - y_low) if price_range > 0 else 0)
+        weekday_axis.set_xticks(x, labels=[weekday_chars[wd] for wd in weekdays])
+        weekday_axis.tick_params(length=0, pad=0, labelsize=7, labelcolor='gray')
+        weekday_axis.spines['bottom'].set_visible(False)
 
         # 设置X轴标签
         step = max(1, len(display_df) // 6)
         tick_positions = list(range(0, len(display_df), step))
-        tick_labels = [display_df.iloc[i]['日期'].strftime('%m-%d') for i in tick_positions]
+        tick_labels = [date_strs[i][5:] for i in tick_positions]
         self.ax.set_xticks(tick_positions)
         self.ax.set_xticklabels(tick_labels, fontsize=8)
 
@@ -609,29 +851,64 @@ class IF300StrategyFrame:
         self.ax.legend(handles=legend_elements, loc='upper left', fontsize=8)
 
         # 设置标题
-        latest_date = display_df.iloc[-1]['日期'].strftime('%Y-%m-%d')
-        latest_contract = display_df.iloc[-1].get('合约', '未知') if '合约' in display_df.columns else '未知'
+        latest_date = date_strs[-1]
+        latest_contract = display_df['合约'].iat[-1] if '合约' in display_df.columns else '未知'
         if not latest_contract:
             latest_contract = '未知'
         self.ax.set_title(f'IF300 季月合约K线图 [{latest_contract}] (截至 {latest_date})', fontsize=10)
 
         # 调整Y轴范围给合约标注和星期留空间
-        self.ax.set_ylim(price_min - price_range * 0.08, price_max + price_range * 0.1)
+        self.ax.set_ylim(y_low, y_high)
 
         # 调整边距
         self.fig.tight_layout()
         self.hover_annotation = None
         self.hover_vline = None
+        self.last_hover_idx = None
         self.canvas.draw()
 
+    def on_chart_draw(self, event):
+        """整图重绘后保存不含悬停元素的背景，供悬停时blit复用"""
+        self.chart_background = self.canvas.copy_from_bbox(self.fig.bbox)
+
+    def blit_hover(self):
+        """只重绘悬停提示和竖线，不重新渲染整张K线图"""
+        if self.chart_background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.chart_background)
+        for artist in (self.hover_vline, self.hover_annotation):
+            if artist is not None and artist.get_visible():
+                self.ax.draw_artist(artist)
+        self.canvas.blit(self.fig.bbox)
+
     def on_mouse_move(self, event):
-        """鼠标移动事件处理"""
+        """鼠标移动事件处理（限制刷新频率，间隔内的事件合并为最后一次）"""
+        now = time.monotonic()
+        if now - self.last_hover_time < HOVER_INTERVAL:
+            if self.pending_hover is None:
+                self.parent.after(int(HOVER_INTERVAL * 1000), self.flush_hover)
+            self.pending_hover = event
+            return
+        self.last_hover_time = now
+        self.show_hover(event)
+
+    def flush_hover(self):
+        """处理限流期间积压的最后一次鼠标事件"""
+        event, self.pending_hover = self.pending_hover, None
+        if event is not None:
+            self.last_hover_time = time.monotonic()
+            self.show_hover(event)
+
+    def show_hover(self, event):
+        """显示鼠标所在K线的提示信息"""
         if event.inaxes != self.ax or self.kline_data is None:
+            self.last_hover_idx = None
             if self.hover_annotation is not None:
                 self.hover_annotation.set_visible(False)
             if self.hover_vline is not None:
                 self.hover_vline.set_visible(False)
-            self.canvas.draw_idle()
+            self.blit_hover()
             return
 
         x = event.xdata
@@ -642,32 +919,36 @@ class IF300StrategyFrame:
         if idx < 0 or idx >= len(self.kline_data):
             return
 
-        row = self.kline_data.iloc[idx]
-        date = row['日期']
-        open_p = row['开盘']
-        high_p = row['最高']
-        low_p = row['最低']
-        close_p = row['收盘']
-        contract = row.get('合约', '')
+        # 仍在同一根K线上，提示已显示
+        if idx == self.last_hover_idx:
+            return
+        self.last_hover_idx = idx
+
+        arrays = self.kline_arrays
+        open_p = arrays['开盘'][idx]
+        high_p = arrays['最高'][idx]
+        low_p = arrays['最低'][idx]
+        close_p = arrays['收盘'][idx]
+        contract = arrays['合约'][idx] if arrays['合约'] is not None else ''
 
         if idx > 0:
-            prev_close = self.kline_data.iloc[idx-1]['收盘']
+            prev_close = arrays['收盘'][idx-1]
             change = close_p - prev_close
             change_pct = change / prev_close * 100
             change_str = f"{change:+.2f} ({change_pct:+.2f}%)"
         else:
             change_str = "--"
 
-        weekday = WEEKDAY_NAMES[date.weekday()]
+        weekday = WEEKDAY_NAMES[arrays['星期'][idx]]
 
         # 获取MA60数据
-        ma60_value = row.get('MA60', None)
+        ma60_value = arrays['MA60'][idx] if arrays['MA60'] is not None else None
         if pd.notna(ma60_value):
             ma60_str = f"\nMA60: {ma60_value:.2f}"
         else:
             ma60_str = ""
 
-        text = (f"{date.strftime('%Y-%m-%d')} {weekday}\n"
+        text = (f"{arrays['日期'][idx]} {weekday}\n"
                 f"合约: {contract}\n"
                 f"开: {open_p:.2f}  高: {high_p:.2f}\n"
                 f"低: {low_p:.2f}  收: {close_p:.2f}\n"
@@ -710,7 +991,7 @@ class IF300StrategyFrame:
                 text, xy=(idx, anchor_y), xytext=(offset_x, offset_y),
                 textcoords='offset points',
                 bbox=dict(boxstyle='round,pad=0.5', facecolor='lightyellow', edgecolor='gray', alpha=0.95),
-                fontsize=9, ha=ha, va=va
+                fontsize=9, ha=ha, va=va, animated=True
             )
         else:
             self.hover_annotation.set_text(text)
@@ -721,12 +1002,13 @@ class IF300StrategyFrame:
             self.hover_annotation.set_visible(True)
 
         if self.hover_vline is None:
-            self.hover_vline = self.ax.axvline(x=idx, color='gray', linestyle='--', linewidth=0.8, alpha=0.7)
+            self.hover_vline = self.ax.axvline(x=idx, color='gray', linestyle='--', linewidth=0.8, alpha=0.7,
+                                               animated=True)
         else:
             self.hover_vline.set_xdata([idx, idx])
             self.hover_vline.set_visible(True)
 
-        self.canvas.draw_idle()
+        self.blit_hover()
 
     def start_auto_refresh(self):
         """启动自动刷新"""
@@ -738,81 +1020,131 @@ class IF300StrategyFrame:
             if is_trading_day and is_trading_hours and self.auto_refresh_enabled:
                 self.refresh_realtime()
                 self.auto_refresh_id = self.parent.after(60000, self.start_auto_refresh)
-                self.realtime_var.set("自动刷新中...")
-                self.realtime_label.configure(foreground='green')
+                self.set_var(self.realtime_var, "自动刷新中...")
+                self.set_color(self.realtime_label, 'green')
             elif is_trading_day and not is_trading_hours:
                 now = datetime.now()
                 if now.hour < 9 or (now.hour == 9 and now.minute < 30):
-                    self.realtime_var.set("盘前等待")
+                    self.set_var(self.realtime_var, "盘前等待")
                 elif now.hour >= 15:
-                    self.realtime_var.set("已收盘")
+                    self.set_var(self.realtime_var, "已收盘")
                 else:
-                    self.realtime_var.set("午休")
-                self.realtime_label.configure(foreground='gray')
+                    self.set_var(self.realtime_var, "午休")
+                self.set_color(self.realtime_label, 'gray')
                 self.auto_refresh_id = self.parent.after(300000, self.start_auto_refresh)
             else:
-                self.realtime_var.set("休市")
-                self.realtime_label.configure(foreground='gray')
+                self.set_var(self.realtime_var, "休市")
+                self.set_color(self.realtime_label, 'gray')
         except Exception as e:
-            self.realtime_var.set("错误")
-            self.realtime_label.configure(foreground='red')
+            self.set_var(self.realtime_var, "错误")
+            self.set_color(self.realtime_label, 'red')
 
     def refresh_realtime(self):
-        """获取实时行情并更新显示"""
-        try:
-            from data_updater import get_realtime_price
+        """在后台线程获取实时行情，网络请求不阻塞界面"""
+        if self.realtime_pending:
+            return
+        self.realtime_pending = True
+
+        def do_fetch():
+            try:
+                from data_updater import get_realtime_price
+                self.parent.after(0, self.on_realtime_complete, get_realtime_price())
+            except Exception as e:
+                self.parent.after(0, self.on_realtime_error, str(e))
 
-            realtime = get_realtime_price()
+        if self.executor is not None:
+            self.executor.submit(do_fetch)
+        else:
+            threading.Thread(target=do_fetch, daemon=True).start()
+
+    def on_realtime_complete(self, realtime):
+        """实时行情获取完成，更新显示"""
+        self.realtime_pending = False
+        try:
             if realtime:
+                self.realtime_failures = 0
                 self.realtime_price = realtime
                 price = realtime['price']
                 time_str = realtime['time'][:5]
                 source = realtime.get('source', '')
 
-                self.realtime_var.set(f"{price:.2f} ({time_str}) [{source}]")
-                self.realtime_label.configure(foreground='green')
+                self.set_var(self.realtime_var, f"{price:.2f} ({time_str}) [{source}]")
+                self.set_color(self.realtime_label, 'green')
 
-                now = datetime.now().strftime('%H:%M:%S')
-                self.refresh_time_var.set(f"数据更新: {now}")
+                self.realtime_received = datetime.now()
+                self.set_var(self.refresh_time_var, f"数据更新: {self.realtime_received:%H:%M:%S}")
 
-                self.update_display_realtime()
+                # 信号区的刷新合并到空闲时执行，连续到达多次行情时只按最新价格刷新一次
+                if not self.realtime_display_pending:
+                    self.realtime_display_pending = True
+                    self.parent.after_idle(self.flush_realtime_display)
             else:
-                self.realtime_var.set("获取失败")
-                self.realtime_label.configure(foreground='red')
+                self.report_realtime_failure("获取失败")
         except Exception as e:
-            self.realtime_var.set("错误")
-            self.realtime_label.configure(foreground='red')
+            self.on_realtime_error(str(e))
 
-    def update_display_realtime(self):
-        """使用系统时钟和实时行情更新信号显示"""
-        if self.df is None or len(self.df) == 0 or self.realtime_price is None:
+    def on_realtime_error(self, error):
+        """实时行情获取失败"""
+        self.realtime_pending = False
+        self.report_realtime_failure("错误")
+
+    def report_realtime_failure(self, text):
+        """记录一次实时行情失败，尚无价格或连续失败多次时才标红提示"""
+        self.realtime_failures += 1
+        if self.realtime_price is not None and self.realtime_failures < REALTIME_FAIL_LIMIT:
+            return
+        self.set_var(self.realtime_var, text)
+        self.set_color(self.realtime_label, 'red')
+
+    def flush_realtime_display(self):
+        """空闲时用最新的实时行情刷新信号显示"""
+        self.realtime_display_pending = False
+        try:
+            self.update_display_realtime(self.realtime_received)
+        except Exception as e:
+            self.on_realtime_error(str(e))
+
+    def update_display_realtime(self, today=None):
+        """使用系统时钟和实时行情更新信号显示，today为收到行情的时间"""
+        if not self.data_ready or self.realtime_price is None:
             return
 
-        today = datetime.now()
+        if today is None:
+            today = datetime.now()
         weekday = today.weekday()
         month = today.month
 
         price = self.realtime_price['price']
-        latest = self.df[self.df['is_warmup'] == False].iloc[-1]
-        ma60 = latest['MA60']
+        ma60 = self.latest_ma60
 
-        self.date_var.set(today.strftime('%Y-%m-%d'))
-        self.weekday_var.set(WEEKDAY_NAMES[weekday])
-        self.price_var.set(f"{price:.2f}")
+        # 价格、日期和MA60都未变化时信号区显示不变，跳过比率计算和信号分析
+        render_key = (price, today.date(), ma60)
+        if render_key == self.realtime_render_key:
+            return
+        self.realtime_render_key = render_key
 
-        if not pd.isna(ma60):
+        self.set_var(self.date_var, today.strftime('%Y-%m-%d'))
+        self.set_var(self.weekday_var, WEEKDAY_NAMES[weekday])
+        self.set_var(self.price_var, f"{price:.2f}")
+
+        if ma60 is not None:
             ratio = price / ma60
-            self.ratio_var.set(f"{ratio:.4f} ({ratio*100:.2f}%)")
+            self.set_var(self.ratio_var, f"{ratio:.4f} ({ratio*100:.2f}%)")
         else:
             ratio = None
 
-        is_delivery_week = today in self.delivery_week_set or pd.Timestamp(today.date()) in self.delivery_week_set
-        self.delivery_var.set("是" if is_delivery_week else "否")
+        is_delivery_week = today.toordinal() in self.delivery_week_set
+        self.set_var(self.delivery_var, DELIVERY_WEEK_TEXT[is_delivery_week])
 
         self.analyze_signal(today, price, ma60, weekday, month, is_delivery_week)
 
     def update_data(self):
         """更新K线数据"""
+        # 同一时间只运行一个更新线程，重复点击不会再启动新的更新
+        if self.update_thread is not None and self.update_thread.is_alive():
+            self.status_var.set("数据正在更新中，请稍候...")
+            return
+
         try:
             from data_updater import update_if_data
 
@@ -821,12 +1153,12 @@ class IF300StrategyFrame:
             def do_update():
                 try:
                     result = update_if_data()
-                    self.parent.after(0, lambda: self.on_update_complete(result))
+                    self.parent.after(0, self.on_update_complete, result)
                 except Exception as e:
-                    self.parent.after(0, lambda: self.on_update_error(str(e)))
+                    self.parent.after(0, self.on_update_error, str(e))
 
-            thread = threading.Thread(target=do_update)
-            thread.start()
+            self.update_thread = threading.Thread(target=do_update, daemon=True)
+            self.update_thread.start()
 
         except ImportError:
             messagebox.showinfo("提示", "数据更新模块未安装。")
@@ -842,53 +1174,20 @@ class IF300StrategyFrame:
         messagebox.showerror("错误", f"数据更新失败:\n{error}")
 
     def show_strategy_info(self):
-        """显示策略说明"""
+        """显示策略说明（窗口只创建一次，关闭时隐藏，再次打开直接显示）"""
+        if self.info_window is not None and self.info_window.winfo_exists():
+            self.info_window.deiconify()
+            self.info_window.lift()
+            return
+
         info_window = tk.Toplevel(self.root)
         info_window.title("IF300 V10.14 策略说明")
         info_window.geometry("700x600")
+        info_window.protocol("WM_DELETE_WINDOW", info_window.withdraw)
 
         text = scrolledtext.ScrolledText(info_window, font=('微软雅黑', 10), wrap=tk.WORD)
         text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
-        strategy_text = """
-================================================================================
-IF300 V10.14 - 综合最优版本（宽止损）
-================================================================================
-
-【版本说明】
-基于500K+大规模参数搜索发现的 #3 最优策略。
-采用宽止损策略，减少被洗出次数，获取更高的年均收益和累计收益。
-
-【历史表现】(2018-2025)
-- 平均年收益率: 135.8%
-- 最大回撤: -27.8%
-- 收益回撤比: 4.89
-- 8年累计净值: 483.5倍
-
-================================================================================
-【做多策略】
-================================================================================
-- 开仓日: 周三、周四（交割周周四除外）
-- MA60比率范围: 99% ~ 110%
-- 持仓天数: 3个交易日
-- 止损: 2.0%
-
-================================================================================
-【做空策略A】（非12月）
-================================================================================
-- 开仓日: 周一
-- MA60比率范围: 98% ~ 110%
-- 持仓天数: 4个交易日
-- 止损: 1.5%
-
-================================================================================
-【做空策略B】（仅12月）
-================================================================================
-- 开仓日: 周五
-- MA60比率范围: ≤100%
-- 持仓天数: 5个交易日
-- 止损: 2.0%
-================================================================================
-"""
-        text.insert(tk.END, strategy_text)
+        text.insert(tk.END, STRATEGY_INFO_TEXT)
         text.config(state=tk.DISABLED)
+        self.info_window = info_window
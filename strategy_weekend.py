@@ -17,6 +17,7 @@ from datetime import datetime, timedelta
 import os
 import sys
 import threading
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -25,7 +26,7 @@ import matplotlib
 matplotlib.use('TkAgg')
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.patches import Rectangle
+from matplotlib.collections import LineCollection, PolyCollection
 
 # 设置中文字体
 import platform
@@ -46,8 +47,72 @@ STOP_LOSS_RATE = 0.965      # 止损比例 (3.5%)
 EXCLUDE_MONTHS = [12]       # 排除月份
 DROP_THRESHOLD = 0.05       # 跌幅触发阈值
 
+# 策略用到的K线列
+KLINE_COLUMNS = ['日期', '开盘', '最高', '最低', '收盘']
+
+# 此日期之前的数据只用于计算均线（warmup期），不参与显示
+WARMUP_END = np.datetime64('2018-01-01')
+
+# 实时行情连续失败后的退避间隔（秒）：从30秒起每次翻倍，最长10分钟，成功一次后恢复
+REALTIME_BACKOFF_BASE = 30
+REALTIME_BACKOFF_MAX = 600
+
 WEEKDAY_NAMES = ['周一', '周二', '周三', '周四', '周五', '周六', '周日']
 
+# 策略说明窗口显示的文本
+STRATEGY_INFO_TEXT = """
+================================================================================
+周末效应 V9 - 创业板ETF策略
+================================================================================
+标的：创业板ETF (159915)
+时间：2018-01-01 至今
+杠杆：2.5倍融资
+
+【历史表现】
+- 年均收益: 76.4%
+- 最大回撤: -18.9%
+- 收益回撤比: 4.04
+
+================================================================================
+【策略参数】
+================================================================================
+- MA30阈值: 0.99 (价格需>MA30*0.99)
+- MA30最大距离: 20%
+- MA5最大距离: 5%
+- MA10最大距离: 12%
+- 止损率: 3.5%
+- 排除月份: 12月
+- 跌幅触发阈值: 5%
+
+================================================================================
+【周四买入条件】
+================================================================================
+1. 当日是周四
+2. 非12月
+3. MA条件全部满足
+4. 本周跌幅≥2%
+   - 跌2%~4%: 持仓5天
+   - 跌4%~6%: 持仓7天
+   - 跌≥6%: 持仓7天
+
+================================================================================
+【周五买入条件】
+================================================================================
+1. 当日是周五
+2. 非12月
+3. MA条件全部满足
+4. 根据周涨跌和当日涨跌决定持仓天数
+
+================================================================================
+【补充买入条件】(5%跌幅触发)
+================================================================================
+1. 非12月
+2. MA条件全部满足
+3. 当前价格比昨日最高或前日最高下跌≥5%
+4. 持仓2天
+================================================================================
+"""
+
 
 def get_data_path():
     """获取数据目录路径"""
@@ -61,18 +126,73 @@ def get_data_path():
     return data_path
 
 
+def check_ma_conditions(price, ma5, ma10, ma30):
+    """
+    通用MA条件：价格>MA30*阈值，且距MA30/MA5/MA10不超过最大距离
+
+    参数可以是标量，也可以是整列数据（Series/数组，逐行返回是否满足）
+    """
+    return ((price > ma30 * MA30_THRESHOLD)
+            & ((price - ma30) / ma30 <= MA30_MAX_DIST)
+            & ((price - ma5) / ma5 <= MA5_MAX_DIST)
+            & ((price - ma10) / ma10 <= MA10_MAX_DIST))
+
+
+def year_week_codes(dates):
+    """
+    按 strftime('%Y-%W') 的规则计算年周编号，返回整数 年*100+周
+
+    周一为一周的第一天，每年第一个周一之前的日子为第0周（与ISO周不同，跨年时一定分属两周）
+    """
+    days = np.asarray(dates).astype('datetime64[D]')
+    years = days.astype('datetime64[Y]')
+    yday = (days - years.astype('datetime64[D]')).astype(np.int64)
+    wday = (days.astype(np.int64) + 3) % 7  # 1970-01-01是周四
+    return ((years.astype(np.int64) + 1970) * 100 + (yday + 7 - wday) // 7).astype(np.int32)
+
+
+def format_buy_range(ma30):
+    """根据MA30生成买入区间文本: MA30*0.99 ~ MA30*1.20"""
+    return f"{ma30 * MA30_THRESHOLD:.3f} ~ {ma30 * (1 + MA30_MAX_DIST):.3f}"
+
+
+def _bar_verts(x, bottom, top, width):
+    """批量生成矩形顶点 (n, 4, 2)，用于PolyCollection"""
+    verts = np.empty((len(x), 4, 2))
+    verts[:, 0, 0] = verts[:, 3, 0] = x - width / 2
+    verts[:, 1, 0] = verts[:, 2, 0] = x + width / 2
+    verts[:, 0, 1] = verts[:, 1, 1] = bottom
+    verts[:, 2, 1] = verts[:, 3, 1] = top
+    return verts
+
+
 class WeekendStrategyFrame:
     """周末效应策略界面模块"""
 
-    def __init__(self, parent):
+    def __init__(self, parent, executor=None):
         self.parent = parent
         self.root = parent.winfo_toplevel()
+        # 后台线程池（由主程序共享），未提供时每次单独起线程
+        self.executor = executor
 
         # 数据变量
         self.df = None
+        self.live_df = None
+        self.live_dates = None
+        self.recent_closes = None
+        self.warmup_end = 0
+        self.date_index = {}
+        self.last_week_idx = None
+
+        # 界面显示缓存
+        self.buy_range_ma30 = None
+        self.info_window = None
 
         # 实时行情相关
         self.realtime_price = None
+        self.realtime_pending = False
+        self.realtime_failures = 0
+        self.realtime_retry_at = 0.0
         self.auto_refresh_id = None
         self.auto_refresh_enabled = True
 
@@ -85,6 +205,11 @@ class WeekendStrategyFrame:
         # 启动自动刷新
         self.parent.after(2000, self.start_auto_refresh)
 
+        # 后台预取实时行情只在标签页可见时运行，界面关闭时停止
+        self.parent.bind('<Map>', lambda event: self.update_background_refresh())
+        self.parent.bind('<Unmap>', lambda event: self.update_background_refresh())
+        self.parent.bind('<Destroy>', lambda event: self.stop_background_refresh())
+
     def create_widgets(self):
         """创建界面组件"""
         # 主框架
@@ -243,9 +368,16 @@ class WeekendStrategyFrame:
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
         self.kline_data = None
+        self.kline_arrays = None
+        self.chart_sig = None
         self.hover_annotation = None
         self.hover_vline = None
+        self.chart_background = None
+        self.layout_done = False
+        self.layout_range = None
         self.canvas.mpl_connect('motion_notify_event', self.on_mouse_move)
+        self.canvas.mpl_connect('draw_event', self.on_chart_draw)
+        self.canvas.mpl_connect('resize_event', self.on_chart_resize)
 
         # ===== 底部状态栏 =====
         status_frame = ttk.Frame(main_frame)
@@ -268,7 +400,9 @@ class WeekendStrategyFrame:
                 self.status_var.set("数据加载失败")
                 return
 
-            df = pd.read_csv(file_path, encoding='utf-8-sig')
+            # 只读取用到的列（价格保持float64，均线和信号判断不受精度影响）
+            df = pd.read_csv(file_path, encoding='utf-8-sig', engine='c',
+                             usecols=lambda col: col.strip() in KLINE_COLUMNS)
             df.columns = df.columns.str.strip()
             df['日期'] = pd.to_datetime(df['日期'])
             df = df.sort_values('日期').reset_index(drop=True)
@@ -281,22 +415,34 @@ class WeekendStrategyFrame:
             # 计算时间特征
             df['weekday'] = df['日期'].dt.weekday
             df['month'] = df['日期'].dt.month
-            df['year_week'] = df['日期'].dt.strftime('%Y-%W')
+            df['year_week'] = year_week_codes(df['日期'].to_numpy())
 
-            # 标记warmup期
-            df['is_warmup'] = df['日期'] < pd.to_datetime('2018-01-01')
+            # 每行对应的上周最后一个交易日的行号（数据按日期排序，同一周的行是连续的一段），没有上周时为-1
+            year_week = df['year_week'].to_numpy()
+            week_start = np.ones(len(df), dtype=bool)
+            week_start[1:] = year_week[1:] != year_week[:-1]
+            self.last_week_idx = np.maximum.accumulate(np.where(week_start, np.arange(len(df)), 0)) - 1
+            # 日期到行号的索引（日期重复时取第一行）
+            self.date_index = {d: i for i, d in reversed(list(enumerate(df['日期'])))}
 
             self.df = df
+            # 数据按日期排序，warmup期是开头连续的一段，按下标切出之后的部分供各显示函数复用
+            self.warmup_end = int(np.searchsorted(df['日期'].to_numpy(), WARMUP_END))
+            self.live_df = df.iloc[self.warmup_end:].reset_index(drop=True)
+            # 日期文本（YYYY-MM-DD）只生成一次，K线图刻度和悬停提示直接取用
+            self.live_dates = np.datetime_as_string(self.live_df['日期'].to_numpy(), unit='D')
+            # 最近30个收盘价，实时行情到达时据此计算含当天价格的均线
+            self.recent_closes = df['收盘'].to_numpy(dtype=float)[-30:]
 
             # 更新界面
             self.update_display()
 
-            data_start = self.df[self.df['is_warmup'] == False]['日期'].min().strftime('%Y-%m-%d')
+            data_start = self.live_dates[0]
             data_end = self.df['日期'].max().strftime('%Y-%m-%d')
             self.status_var.set(f"数据加载完成 | 数据范围: {data_start} ~ {data_end}")
 
             now = datetime.now().strftime('%H:%M:%S')
-            self.refresh_time_var.set(f"数据更新: {now}")
+            self.set_var(self.refresh_time_var, f"数据更新: {now}")
 
         except Exception as e:
             messagebox.showerror("错误", f"加载数据失败:\n{str(e)}")
@@ -307,37 +453,41 @@ class WeekendStrategyFrame:
         if self.df is None:
             return None
 
-        try:
-            current_idx = self.df[self.df['日期'] == current_date].index[0]
-            current_week = self.df.loc[current_idx, 'year_week']
-
-            for i in range(current_idx - 1, -1, -1):
-                prev_week = self.df.loc[i, 'year_week']
-                if prev_week != current_week:
-                    return self.df.loc[i, '收盘']
+        current_idx = self.date_index.get(current_date)
+        if current_idx is None:
             return None
-        except:
+
+        prev_idx = self.last_week_idx[current_idx]
+        if prev_idx < 0:
             return None
+        return self.df['收盘'].iat[prev_idx]
 
     def get_previous_high(self, current_date, days_back=1):
         """获取N天前的最高价"""
         if self.df is None:
             return None
 
-        try:
-            current_idx = self.df[self.df['日期'] == current_date].index[0]
-            if current_idx >= days_back:
-                return self.df.loc[current_idx - days_back, '最高']
-            return None
-        except:
+        current_idx = self.date_index.get(current_date)
+        if current_idx is None or current_idx < days_back:
             return None
+        return self.df['最高'].iat[current_idx - days_back]
+
+    def set_var(self, var, value):
+        """值有变化时才写入StringVar，避免无效的Tk刷新"""
+        if var.get() != value:
+            var.set(value)
+
+    def set_color(self, label, color):
+        """前景色有变化时才重新设置"""
+        if str(label.cget('foreground')) != color:
+            label.configure(foreground=color)
 
     def update_display(self):
         """更新界面显示"""
         if self.df is None or len(self.df) == 0:
             return
 
-        latest = self.df[self.df['is_warmup'] == False].iloc[-1]
+        latest = self.live_df.iloc[-1]
         price = latest['收盘']
         ma5 = latest['MA5']
         ma10 = latest['MA10']
@@ -348,12 +498,12 @@ class WeekendStrategyFrame:
         weekday = current_date.weekday()
         month = current_date.month
 
-        self.date_var.set(current_date.strftime('%Y-%m-%d'))
-        self.weekday_var.set(WEEKDAY_NAMES[weekday])
-        self.price_var.set(f"{price:.3f}")
-        self.ma5_var.set(f"{ma5:.3f}" if not pd.isna(ma5) else "--")
-        self.ma10_var.set(f"{ma10:.3f}" if not pd.isna(ma10) else "--")
-        self.ma30_var.set(f"{ma30:.3f}" if not pd.isna(ma30) else "--")
+        self.set_var(self.date_var, current_date.strftime('%Y-%m-%d'))
+        self.set_var(self.weekday_var, WEEKDAY_NAMES[weekday])
+        self.set_var(self.price_var, f"{price:.3f}")
+        self.set_var(self.ma5_var, f"{ma5:.3f}" if not pd.isna(ma5) else "--")
+        self.set_var(self.ma10_var, f"{ma10:.3f}" if not pd.isna(ma10) else "--")
+        self.set_var(self.ma30_var, f"{ma30:.3f}" if not pd.isna(ma30) else "--")
 
         # 计算周跌幅
         last_week_close = self.get_last_week_close(current_date)
@@ -373,17 +523,13 @@ class WeekendStrategyFrame:
     def analyze_signal(self, current_date, price, ma5, ma10, ma30, weekday, month, week_decline, yesterday_high, day_before_high):
         """分析交易信号"""
         if pd.isna(ma30) or pd.isna(ma5) or pd.isna(ma10):
-            self.thu_weekday_var.set("均线数据不足")
-            self.fri_weekday_var.set("均线数据不足")
-            self.sup_month_var.set("均线数据不足")
+            self.set_var(self.thu_weekday_var, "均线数据不足")
+            self.set_var(self.fri_weekday_var, "均线数据不足")
+            self.set_var(self.sup_month_var, "均线数据不足")
             return
 
         # ===== 通用MA条件 =====
-        ma30_ok = price > ma30 * MA30_THRESHOLD
-        ma30_dist_ok = (price - ma30) / ma30 <= MA30_MAX_DIST
-        ma5_dist_ok = (price - ma5) / ma5 <= MA5_MAX_DIST
-        ma10_dist_ok = (price - ma10) / ma10 <= MA10_MAX_DIST
-        ma_all_ok = ma30_ok and ma30_dist_ok and ma5_dist_ok and ma10_dist_ok
+        ma_all_ok = bool(check_ma_conditions(price, ma5, ma10, ma30))
 
         month_ok = month not in EXCLUDE_MONTHS
 
@@ -391,66 +537,66 @@ class WeekendStrategyFrame:
 
         # ===== 周四买入条件 =====
         thu_weekday_ok = weekday == 3
-        self.thu_weekday_var.set(f"星期: {WEEKDAY_NAMES[weekday]} (需要周四)")
-        self.thu_weekday_label.configure(foreground='green' if thu_weekday_ok else 'red')
+        self.set_var(self.thu_weekday_var, f"星期: {WEEKDAY_NAMES[weekday]} (需要周四)")
+        self.set_color(self.thu_weekday_label, 'green' if thu_weekday_ok else 'red')
 
-        self.thu_month_var.set(f"月份: {month}月 ({'排除' if month in EXCLUDE_MONTHS else '可交易'})")
-        self.thu_month_label.configure(foreground='green' if month_ok else 'red')
+        self.set_var(self.thu_month_var, f"月份: {month}月 ({'排除' if month in EXCLUDE_MONTHS else '可交易'})")
+        self.set_color(self.thu_month_label, 'green' if month_ok else 'red')
 
-        self.thu_ma_var.set(ma_text)
-        self.thu_ma_label.configure(foreground='green' if ma_all_ok else 'red')
+        self.set_var(self.thu_ma_var, ma_text)
+        self.set_color(self.thu_ma_label, 'green' if ma_all_ok else 'red')
 
         # 周跌幅条件
         if week_decline is not None:
             decline_pct = week_decline * 100
             thu_decline_ok = week_decline <= -0.02  # 需要跌≥2%
-            self.thu_decline_var.set(f"周跌幅: {decline_pct:.2f}% (需要≤-2%)")
-            self.thu_decline_label.configure(foreground='green' if thu_decline_ok else 'red')
+            self.set_var(self.thu_decline_var, f"周跌幅: {decline_pct:.2f}% (需要≤-2%)")
+            self.set_color(self.thu_decline_label, 'green' if thu_decline_ok else 'red')
         else:
             thu_decline_ok = False
-            self.thu_decline_var.set("周跌幅: 无数据")
-            self.thu_decline_label.configure(foreground='gray')
+            self.set_var(self.thu_decline_var, "周跌幅: 无数据")
+            self.set_color(self.thu_decline_label, 'gray')
 
         thu_signal = thu_weekday_ok and month_ok and ma_all_ok and thu_decline_ok
         if thu_signal:
-            self.thu_result_var.set("✓ 满足周四买入")
-            self.thu_result_label.configure(foreground='green')
+            self.set_var(self.thu_result_var, "✓ 满足周四买入")
+            self.set_color(self.thu_result_label, 'green')
         else:
-            self.thu_result_var.set("✗ 不满足")
-            self.thu_result_label.configure(foreground='gray')
+            self.set_var(self.thu_result_var, "✗ 不满足")
+            self.set_color(self.thu_result_label, 'gray')
 
         # ===== 周五买入条件 =====
         fri_weekday_ok = weekday == 4
-        self.fri_weekday_var.set(f"星期: {WEEKDAY_NAMES[weekday]} (需要周五)")
-        self.fri_weekday_label.configure(foreground='green' if fri_weekday_ok else 'red')
+        self.set_var(self.fri_weekday_var, f"星期: {WEEKDAY_NAMES[weekday]} (需要周五)")
+        self.set_color(self.fri_weekday_label, 'green' if fri_weekday_ok else 'red')
 
-        self.fri_month_var.set(f"月份: {month}月 ({'排除' if month in EXCLUDE_MONTHS else '可交易'})")
-        self.fri_month_label.configure(foreground='green' if month_ok else 'red')
+        self.set_var(self.fri_month_var, f"月份: {month}月 ({'排除' if month in EXCLUDE_MONTHS else '可交易'})")
+        self.set_color(self.fri_month_label, 'green' if month_ok else 'red')
 
-        self.fri_ma_var.set(ma_text)
-        self.fri_ma_label.configure(foreground='green' if ma_all_ok else 'red')
+        self.set_var(self.fri_ma_var, ma_text)
+        self.set_color(self.fri_ma_label, 'green' if ma_all_ok else 'red')
 
         if week_decline is not None:
-            self.fri_decline_var.set(f"周跌幅: {decline_pct:.2f}%")
-            self.fri_decline_label.configure(foreground='blue')
+            self.set_var(self.fri_decline_var, f"周跌幅: {decline_pct:.2f}%")
+            self.set_color(self.fri_decline_label, 'blue')
         else:
-            self.fri_decline_var.set("周跌幅: 无数据")
-            self.fri_decline_label.configure(foreground='gray')
+            self.set_var(self.fri_decline_var, "周跌幅: 无数据")
+            self.set_color(self.fri_decline_label, 'gray')
 
         fri_signal = fri_weekday_ok and month_ok and ma_all_ok
         if fri_signal:
-            self.fri_result_var.set("✓ 满足周五买入")
-            self.fri_result_label.configure(foreground='green')
+            self.set_var(self.fri_result_var, "✓ 满足周五买入")
+            self.set_color(self.fri_result_label, 'green')
         else:
-            self.fri_result_var.set("✗ 不满足")
-            self.fri_result_label.configure(foreground='gray')
+            self.set_var(self.fri_result_var, "✗ 不满足")
+            self.set_color(self.fri_result_label, 'gray')
 
         # ===== 补充买入条件（5%跌幅触发）=====
-        self.sup_month_var.set(f"月份: {month}月 ({'排除' if month in EXCLUDE_MONTHS else '可交易'})")
-        self.sup_month_label.configure(foreground='green' if month_ok else 'red')
+        self.set_var(self.sup_month_var, f"月份: {month}月 ({'排除' if month in EXCLUDE_MONTHS else '可交易'})")
+        self.set_color(self.sup_month_label, 'green' if month_ok else 'red')
 
-        self.sup_ma_var.set(ma_text)
-        self.sup_ma_label.configure(foreground='green' if ma_all_ok else 'red')
+        self.set_var(self.sup_ma_var, ma_text)
+        self.set_color(self.sup_ma_label, 'green' if ma_all_ok else 'red')
 
         # 检查跌幅触发
         drop_triggered = False
@@ -471,57 +617,73 @@ class WeekendStrategyFrame:
         if not drop_triggered:
             drop_text += "未触发(需≤-5%)"
 
-        self.sup_drop_var.set(drop_text)
-        self.sup_drop_label.configure(foreground='green' if drop_triggered else 'red')
+        self.set_var(self.sup_drop_var, drop_text)
+        self.set_color(self.sup_drop_label, 'green' if drop_triggered else 'red')
 
         sup_signal = month_ok and ma_all_ok and drop_triggered
         if sup_signal:
-            self.sup_result_var.set("✓ 满足补充买入")
-            self.sup_result_label.configure(foreground='green')
+            self.set_var(self.sup_result_var, "✓ 满足补充买入")
+            self.set_color(self.sup_result_label, 'green')
         else:
-            self.sup_result_var.set("✗ 不满足")
-            self.sup_result_label.configure(foreground='gray')
+            self.set_var(self.sup_result_var, "✗ 不满足")
+            self.set_color(self.sup_result_label, 'gray')
 
     def update_price_range(self, price, ma30):
         """计算并更新可开仓价格区间"""
         if pd.isna(ma30):
-            self.buy_price_range_var.set("MA30数据不足")
-            self.stop_loss_var.set("--")
+            self.buy_range_ma30 = None
+            self.set_var(self.buy_price_range_var, "MA30数据不足")
+            self.set_var(self.stop_loss_var, "--")
             return
 
-        # 买入区间: MA30*0.99 ~ MA30*1.20
-        buy_min = ma30 * MA30_THRESHOLD
-        buy_max = ma30 * (1 + MA30_MAX_DIST)
-        self.buy_price_range_var.set(f"{buy_min:.3f} ~ {buy_max:.3f}")
+        # 实时MA30包含当前价格，每次行情刷新都会变化；只在与上次显示的MA30相同时跳过格式化
+        if ma30 != self.buy_range_ma30:
+            self.buy_range_ma30 = ma30
+            self.set_var(self.buy_price_range_var, format_buy_range(float(ma30)))
 
         # 止损价
         stop_loss = price * STOP_LOSS_RATE
-        self.stop_loss_var.set(f"{stop_loss:.3f} (-3.5%)")
+        self.set_var(self.stop_loss_var, f"{stop_loss:.3f} (-3.5%)")
 
     def update_kline_chart(self):
         """更新K线图"""
         if self.df is None or len(self.df) == 0:
             return
 
+        display_df = self.live_df.tail(120).reset_index(drop=True)
+        date_strs = self.live_dates[-len(display_df):]
+        x = np.arange(len(display_df))
+        opens = display_df['开盘'].to_numpy(dtype=float)
+        highs = display_df['最高'].to_numpy(dtype=float)
+        lows = display_df['最低'].to_numpy(dtype=float)
+        closes = display_df['收盘'].to_numpy(dtype=float)
+
+        # 显示的K线和均线未变化时（如重新加载了相同的数据）跳过重绘
+        chart_sig = (display_df['日期'].to_numpy().tobytes(),
+                     display_df[['开盘', '最高', '最低', '收盘', 'MA5', 'MA10', 'MA30']].to_numpy(dtype=float).tobytes())
+        if chart_sig == self.chart_sig:
+            return
+        self.chart_sig = chart_sig
+
+        self.chart_background = None
         self.ax.clear()
-        display_df = self.df[self.df['is_warmup'] == False].tail(120).copy()
-        display_df = display_df.reset_index(drop=True)
         self.kline_data = display_df
+        # 悬停提示按下标直接读取的列数组，避免每次移动鼠标都构造一行Series
+        self.kline_arrays = {
+            '日期': date_strs, '星期': display_df['weekday'].to_numpy(), '开盘': opens, '最高': highs, '最低': lows, '收盘': closes,
+            'MA30': display_df['MA30'].to_numpy(dtype=float),
+        }
 
-        for idx, row in display_df.iterrows():
-            open_p = row['开盘']
-            close_p = row['收盘']
-            high_p = row['最高']
-            low_p = row['最低']
+        # 绘制K线（影线和实体各用一个集合批量绘制，涨红跌绿）
+        colors = np.where(closes >= opens, 'red', 'green')
 
-            color = 'red' if close_p >= open_p else 'green'
-            self.ax.plot([idx, idx], [low_p, high_p], color=color, linewidth=0.8)
+        wicks = np.stack([np.column_stack([x, lows]), np.column_stack([x, highs])], axis=1)
+        self.ax.add_collection(LineCollection(wicks, colors=colors, linewidths=0.8))
 
-            body_bottom = min(open_p, close_p)
-            body_height = abs(close_p - open_p)
-            rect = Rectangle((idx - 0.35, body_bottom), 0.7, body_height,
-                            facecolor=color, edgecolor=color, linewidth=0.5)
-            self.ax.add_patch(rect)
+        body_bottom = np.minimum(opens, closes)
+        body_top = np.maximum(opens, closes)
+        self.ax.add_collection(PolyCollection(_bar_verts(x, body_bottom, body_top, 0.7),
+                                              facecolors=colors, edgecolors=colors, linewidths=0.5))
 
         # 绘制均线
         if 'MA5' in display_df.columns:
@@ -544,16 +706,15 @@ class WeekendStrategyFrame:
 
         self.ax.set_xlim(-1, len(display_df))
 
-        prices = display_df[['开盘', '收盘', '最高', '最低']].values.flatten()
-        prices = prices[~np.isnan(prices)]
-        if len(prices) > 0:
-            price_min, price_max = prices.min(), prices.max()
+        # 最低价/最高价已覆盖开盘和收盘，直接在这两列上求范围
+        if not (np.isnan(lows).all() or np.isnan(highs).all()):
+            price_min, price_max = np.nanmin(lows), np.nanmax(highs)
             margin = (price_max - price_min) * 0.05
             self.ax.set_ylim(price_min - margin, price_max + margin)
 
         tick_step = max(1, len(display_df) // 10)
         tick_positions = list(range(0, len(display_df), tick_step))
-        tick_labels = [display_df.iloc[i]['日期'].strftime('%m/%d') for i in tick_positions]
+        tick_labels = [date_strs[i][5:].replace('-', '/') for i in tick_positions]
         self.ax.set_xticks(tick_positions)
         self.ax.set_xticklabels(tick_labels, rotation=45, ha='right')
 
@@ -561,11 +722,38 @@ class WeekendStrategyFrame:
         self.ax.grid(True, alpha=0.3)
         self.ax.set_title('创业板ETF (159915) K线图', fontsize=12)
 
-        self.fig.tight_layout()
+        # 边距在首次绘制、窗口缩放以及显示的日期/价格范围变化（刻度标签宽度可能改变）时重新计算
+        layout_range = (date_strs[0], date_strs[-1], self.ax.get_ylim())
+        if layout_range != self.layout_range:
+            self.layout_range = layout_range
+            self.layout_done = False
+        if not self.layout_done:
+            self.fig.tight_layout()
+            self.layout_done = True
         self.hover_annotation = None
         self.hover_vline = None
         self.canvas.draw()
 
+    def on_chart_resize(self, event):
+        """窗口缩放后按新尺寸重新计算边距"""
+        if self.kline_data is not None:
+            self.fig.tight_layout()
+
+    def on_chart_draw(self, event):
+        """整图重绘后保存不含悬停元素的背景，供悬停时blit复用"""
+        self.chart_background = self.canvas.copy_from_bbox(self.fig.bbox)
+
+    def blit_hover(self):
+        """只重绘悬停提示和竖线，不重新渲染整张K线图"""
+        if self.chart_background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.chart_background)
+        for artist in (self.hover_vline, self.hover_annotation):
+            if artist is not None and artist.get_visible():
+                self.ax.draw_artist(artist)
+        self.canvas.blit(self.fig.bbox)
+
     def on_mouse_move(self, event):
         """鼠标移动事件处理"""
         if event.inaxes != self.ax or self.kline_data is None:
@@ -573,7 +761,7 @@ class WeekendStrategyFrame:
                 self.hover_annotation.set_visible(False)
             if self.hover_vline is not None:
                 self.hover_vline.set_visible(False)
-            self.canvas.draw_idle()
+            self.blit_hover()
             return
 
         x = event.xdata
@@ -584,31 +772,30 @@ class WeekendStrategyFrame:
         if idx < 0 or idx >= len(self.kline_data):
             return
 
-        row = self.kline_data.iloc[idx]
-        date = row['日期']
-        open_p = row['开盘']
-        high_p = row['最高']
-        low_p = row['最低']
-        close_p = row['收盘']
+        arrays = self.kline_arrays
+        open_p = arrays['开盘'][idx]
+        high_p = arrays['最高'][idx]
+        low_p = arrays['最低'][idx]
+        close_p = arrays['收盘'][idx]
 
         if idx > 0:
-            prev_close = self.kline_data.iloc[idx-1]['收盘']
+            prev_close = arrays['收盘'][idx-1]
             change = close_p - prev_close
             change_pct = change / prev_close * 100
             change_str = f"{change:+.3f} ({change_pct:+.2f}%)"
         else:
             change_str = "--"
 
-        weekday = WEEKDAY_NAMES[date.weekday()]
+        weekday = WEEKDAY_NAMES[arrays['星期'][idx]]
 
         # 获取MA30数据
-        ma30_value = row.get('MA30', None)
+        ma30_value = arrays['MA30'][idx]
         if pd.notna(ma30_value):
             ma30_str = f"\nMA30: {ma30_value:.3f}"
         else:
             ma30_str = ""
 
-        text = (f"{date.strftime('%Y-%m-%d')} {weekday}\n"
+        text = (f"{arrays['日期'][idx]} {weekday}\n"
                 f"开: {open_p:.3f}  高: {high_p:.3f}\n"
                 f"低: {low_p:.3f}  收: {close_p:.3f}\n"
                 f"涨跌: {change_str}{ma30_str}")
@@ -650,7 +837,7 @@ class WeekendStrategyFrame:
                 text, xy=(idx, anchor_y), xytext=(offset_x, offset_y),
                 textcoords='offset points',
                 bbox=dict(boxstyle='round,pad=0.5', facecolor='lightyellow', edgecolor='gray', alpha=0.95),
-                fontsize=9, ha=ha, va=va
+                fontsize=9, ha=ha, va=va, animated=True
             )
         else:
             self.hover_annotation.set_text(text)
@@ -661,67 +848,119 @@ class WeekendStrategyFrame:
             self.hover_annotation.set_visible(True)
 
         if self.hover_vline is None:
-            self.hover_vline = self.ax.axvline(x=idx, color='gray', linestyle='--', linewidth=0.8, alpha=0.7)
+            self.hover_vline = self.ax.axvline(x=idx, color='gray', linestyle='--', linewidth=0.8, alpha=0.7,
+                                               animated=True)
         else:
             self.hover_vline.set_xdata([idx, idx])
             self.hover_vline.set_visible(True)
 
-        self.canvas.draw_idle()
+        self.blit_hover()
 
     def start_auto_refresh(self):
         """启动自动刷新"""
         try:
-            from weekend_data_updater import is_trading_time, get_etf_realtime_price
+            from weekend_data_updater import is_trading_time
 
             is_trading_day, is_trading_hours, _ = is_trading_time()
+            self.update_background_refresh()
 
             if is_trading_day and is_trading_hours and self.auto_refresh_enabled:
                 self.refresh_realtime()
                 self.auto_refresh_id = self.parent.after(60000, self.start_auto_refresh)
-                self.realtime_var.set("自动刷新中...")
-                self.realtime_label.configure(foreground='green')
+                self.set_var(self.realtime_var, "自动刷新中...")
+                self.set_color(self.realtime_label, 'green')
             elif is_trading_day and not is_trading_hours:
                 now = datetime.now()
                 if now.hour < 9 or (now.hour == 9 and now.minute < 30):
-                    self.realtime_var.set("盘前等待")
+                    self.set_var(self.realtime_var, "盘前等待")
                 elif now.hour >= 15:
-                    self.realtime_var.set("已收盘")
+                    self.set_var(self.realtime_var, "已收盘")
                 else:
-                    self.realtime_var.set("午休")
-                self.realtime_label.configure(foreground='gray')
+                    self.set_var(self.realtime_var, "午休")
+                self.set_color(self.realtime_label, 'gray')
                 self.auto_refresh_id = self.parent.after(300000, self.start_auto_refresh)
             else:
-                self.realtime_var.set("休市")
-                self.realtime_label.configure(foreground='gray')
+                self.set_var(self.realtime_var, "休市")
+                self.set_color(self.realtime_label, 'gray')
         except Exception as e:
-            self.realtime_var.set("--")
-            self.realtime_label.configure(foreground='gray')
+            self.set_var(self.realtime_var, "--")
+            self.set_color(self.realtime_label, 'gray')
+
+    def update_background_refresh(self):
+        """后台预取实时行情只在标签页可见、交易时段内且未处于失败退避时运行，否则停止"""
+        from weekend_data_updater import is_trading_time, start_background_refresh
+        if (self.auto_refresh_enabled and self.parent.winfo_ismapped() and is_trading_time()[1]
+                and time.monotonic() >= self.realtime_retry_at):
+            start_background_refresh()
+        else:
+            self.stop_background_refresh()
+
+    def stop_background_refresh(self):
+        """停止后台预取实时行情"""
+        from weekend_data_updater import stop_background_refresh
+        stop_background_refresh()
 
     def refresh_realtime(self):
-        """获取实时行情并更新显示"""
-        try:
-            from weekend_data_updater import get_etf_realtime_price
+        """在后台线程获取实时行情，网络请求不阻塞界面"""
+        if self.realtime_pending:
+            return
+        # 接口连续失败时暂停请求，避免被限流
+        if time.monotonic() < self.realtime_retry_at:
+            return
+        self.realtime_pending = True
 
-            realtime = get_etf_realtime_price()
+        def do_fetch():
+            try:
+                from weekend_data_updater import get_etf_realtime_price
+                self.parent.after(0, self.on_realtime_complete, get_etf_realtime_price())
+            except Exception as e:
+                self.parent.after(0, self.on_realtime_error, str(e))
+
+        if self.executor is not None:
+            self.executor.submit(do_fetch)
+        else:
+            threading.Thread(target=do_fetch, daemon=True).start()
+
+    def on_realtime_complete(self, realtime):
+        """实时行情获取完成，更新显示"""
+        self.realtime_pending = False
+        try:
             if realtime:
+                self.realtime_failures = 0
+                self.realtime_retry_at = 0.0
                 self.realtime_price = realtime
                 price = realtime['price']
                 time_str = realtime.get('time', '')[:5]
                 source = realtime.get('source', '')
 
-                self.realtime_var.set(f"{price:.3f} ({time_str}) [{source}]")
-                self.realtime_label.configure(foreground='green')
+                self.set_var(self.realtime_var, f"{price:.3f} ({time_str}) [{source}]")
+                self.set_color(self.realtime_label, 'green')
 
                 now = datetime.now().strftime('%H:%M:%S')
-                self.refresh_time_var.set(f"数据更新: {now}")
+                self.set_var(self.refresh_time_var, f"数据更新: {now}")
 
                 self.update_display_realtime()
             else:
-                self.realtime_var.set("获取失败")
-                self.realtime_label.configure(foreground='red')
+                self.back_off_realtime()
+                self.set_var(self.realtime_var, "获取失败")
+                self.set_color(self.realtime_label, 'red')
         except Exception as e:
-            self.realtime_var.set("错误")
-            self.realtime_label.configure(foreground='red')
+            self.on_realtime_error(str(e))
+
+    def on_realtime_error(self, error):
+        """实时行情获取失败"""
+        self.realtime_pending = False
+        self.back_off_realtime()
+        self.set_var(self.realtime_var, "错误")
+        self.set_color(self.realtime_label, 'red')
+
+    def back_off_realtime(self):
+        """记录一次失败，按连续失败次数指数延长下次请求的间隔"""
+        self.realtime_failures += 1
+        delay = min(REALTIME_BACKOFF_BASE * 2 ** (self.realtime_failures - 1), REALTIME_BACKOFF_MAX)
+        self.realtime_retry_at = time.monotonic() + delay
+        # 退避期间后台预取也暂停，恢复后由自动刷新重新启动
+        self.stop_background_refresh()
 
     def update_display_realtime(self):
         """使用系统时钟和实时行情更新信号显示"""
@@ -733,14 +972,21 @@ class WeekendStrategyFrame:
         month = today.month
 
         price = self.realtime_price['price']
-        latest = self.df[self.df['is_warmup'] == False].iloc[-1]
-        ma5 = latest['MA5']
-        ma10 = latest['MA10']
-        ma30 = latest['MA30']
-
-        self.date_var.set(today.strftime('%Y-%m-%d'))
-        self.weekday_var.set(WEEKDAY_NAMES[weekday])
-        self.price_var.set(f"{price:.3f}")
+        latest = self.live_df.iloc[-1]
+
+        # 均线把实时价格当作当天收盘价计算：数据已含行情当天的K线时替换最后一根，否则追加一根
+        closes = self.recent_closes
+        if self.realtime_price.get('date', '')[:10] == self.live_dates[-1]:
+            closes = closes[:-1]
+        closes = np.append(closes[-29:], price)
+        ma5, ma10, ma30 = (closes[-n:].mean() if len(closes) >= n else np.nan for n in (5, 10, 30))
+
+        self.set_var(self.date_var, today.strftime('%Y-%m-%d'))
+        self.set_var(self.weekday_var, WEEKDAY_NAMES[weekday])
+        self.set_var(self.price_var, f"{price:.3f}")
+        self.set_var(self.ma5_var, f"{ma5:.3f}" if not pd.isna(ma5) else "--")
+        self.set_var(self.ma10_var, f"{ma10:.3f}" if not pd.isna(ma10) else "--")
+        self.set_var(self.ma30_var, f"{ma30:.3f}" if not pd.isna(ma30) else "--")
 
         # 计算周跌幅（使用最近数据估算）
         last_week_close = self.get_last_week_close(latest['日期'])
@@ -765,9 +1011,9 @@ class WeekendStrategyFrame:
             def do_update():
                 try:
                     result = update_etf_data()
-                    self.parent.after(0, lambda: self.on_update_complete(result))
+                    self.parent.after(0, self.on_update_complete, result)
                 except Exception as e:
-                    self.parent.after(0, lambda: self.on_update_error(str(e)))
+                    self.parent.after(0, self.on_update_error, str(e))
 
             thread = threading.Thread(target=do_update)
             thread.start()
@@ -786,65 +1032,20 @@ class WeekendStrategyFrame:
         messagebox.showerror("错误", f"数据更新失败:\n{error}")
 
     def show_strategy_info(self):
-        """显示策略说明"""
+        """显示策略说明（窗口只创建一次，关闭时隐藏，再次打开直接显示）"""
+        if self.info_window is not None and self.info_window.winfo_exists():
+            self.info_window.deiconify()
+            self.info_window.lift()
+            return
+
         info_window = tk.Toplevel(self.root)
         info_window.title("周末效应 V9 策略说明")
         info_window.geometry("700x600")
+        info_window.protocol("WM_DELETE_WINDOW", info_window.withdraw)
 
         text = scrolledtext.ScrolledText(info_window, font=('微软雅黑', 10), wrap=tk.WORD)
         text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
-        strategy_text = """
-================================================================================
-周末效应 V9 - 创业板ETF策略
-================================================================================
-标的：创业板ETF (159915)
-时间：2018-01-01 至今
-杠杆：2.5倍融资
-
-【历史表现】
-- 年均收益: 76.4%
-- 最大回撤: -18.9%
-- 收益回撤比: 4.04
-
-================================================================================
-【策略参数】
-================================================================================
-- MA30阈值: 0.99 (价格需>MA30*0.99)
-- MA30最大距离: 20%
-- MA5最大距离: 5%
-- MA10最大距离: 12%
-- 止损率: 3.5%
-- 排除月份: 12月
-- 跌幅触发阈值: 5%
-
-================================================================================
-【周四买入条件】
-================================================================================
-1. 当日是周四
-2. 非12月
-3. MA条件全部满足
-4. 本周跌幅≥2%
-   - 跌2%~4%: 持仓5天
-   - 跌4%~6%: 持仓7天
-   - 跌≥6%: 持仓7天
-
-================================================================================
-【周五买入条件】
-================================================================================
-1. 当日是周五
-2. 非12月
-3. MA条件全部满足
-4. 根据周涨跌和当日涨跌决定持仓天数
-
-================================================================================
-【补充买入条件】(5%跌幅触发)
-================================================================================
-1. 非12月
-2. MA条件全部满足
-3. 当前价格比昨日最高或前日最高下跌≥5%
-4. 持仓2天
-================================================================================
-"""
-        text.insert(tk.END, strategy_text)
+        text.insert(tk.END, STRATEGY_INFO_TEXT)
         text.config(state=tk.DISABLED)
+        self.info_window = info_window
@@ -11,12 +11,114 @@
 ================================================================================
 """
 
+import io
 import os
+import bisect
 import sys
+import json
+import time
+import random
+import threading
+import concurrent.futures
 import pandas as pd
-import requests
 from datetime import datetime, timedelta
 
+# 可选：安装pyarrow后在CSV旁保存parquet镜像，读取时跳过CSV解析
+try:
+    import pyarrow  # noqa: F401
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+# 可选：安装orjson后用其解析行情接口返回的JSON
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# 交易时段分界（以分钟计）：9:30、11:30之后、13:00、15:00之后
+TRADING_BOUNDARIES = (9 * 60 + 30, 11 * 60 + 31, 13 * 60, 15 * 60 + 1)
+# 各区间对应的 (是否交易时段, 提示)
+TRADING_STATES = (
+    (False, "盘前，日线数据通常在收盘后(15:00)更新"),
+    (True, "交易时段中，日线数据将在收盘后(15:00)更新"),
+    (False, "午间休市，日线数据将在收盘后(15:00)更新"),
+    (True, "交易时段中，日线数据将在收盘后(15:00)更新"),
+    (False, "已收盘，如数据未更新请稍后重试"),
+)
+
+# 并行查询实时行情时等待各数据源的最长时间（秒）
+REALTIME_TIMEOUT = 6
+
+# 实时行情缓存：有效期内重复调用（界面刷新、切换标签页等）直接返回上次结果
+REALTIME_CACHE_TTL = 30
+_realtime_cache = {'time': 0.0, 'result': None}
+# 同时发起的多个调用只请求一次接口，其余等待并复用结果
+_realtime_lock = threading.Lock()
+# 后台预取：交易时段内每隔约20秒（另加0~2秒随机抖动）刷新一次缓存
+REALTIME_WARM_INTERVAL = 20
+# 当前预取线程的停止标志，线程未运行时为None或已置位
+_warm_stop = None
+
+# 单个接口失败后暂停请求的秒数：3、6、12...最多60秒，另加0~1秒随机抖动，避免被限流后反复请求
+PROVIDER_BACKOFF_BASE = 3
+PROVIDER_BACKOFF_MAX = 60
+# 各接口的退避状态 {接口名: (连续失败次数, 暂停到的时间)}
+_provider_backoff = {}
+
+# 各行情接口共用的HTTP会话，保持长连接，重复请求时免去TCP/TLS握手
+# 首次请求时才创建（并导入requests），界面线程导入本模块判断交易时间时不必加载requests
+_session = None
+_session_lock = threading.Lock()
+
+# 行情接口地址及固定参数
+SINA_REALTIME_URL = 'https://hq.sinajs.cn/list=sz159915'
+SINA_HEADERS = {'Referer': 'https://finance.sina.com.cn'}
+TENCENT_REALTIME_URL = 'https://qt.gtimg.cn/q=sz159915'
+EASTMONEY_REALTIME_URL = 'https://push2.eastmoney.com/api/qt/stock/get'
+EASTMONEY_REALTIME_PARAMS = {
+    'secid': '0.159915',
+    'fields': 'f43,f44,f45,f46,f47,f48,f57,f58,f60,f169,f170',
+    'ut': 'fa5fd1943c7b386f172d6893dbfba10b'
+}
+NETEASE_REALTIME_URL = 'http://api.money.126.net/data/feed/1159915,money.api'
+# 东方财富日线数据API，起始日期beg按现有数据在请求时填入
+EASTMONEY_KLINE_URL = 'https://push2his.eastmoney.com/api/qt/stock/kline/get'
+EASTMONEY_KLINE_PARAMS = {
+    'secid': '0.159915',
+    'fields1': 'f1,f2,f3,f4,f5,f6',
+    'fields2': 'f51,f52,f53,f54,f55,f56,f57',
+    'klt': '101',  # 日线
+    'fqt': '0',    # 不复权
+    'end': '20500101',
+    'ut': 'fa5fd1943c7b386f172d6893dbfba10b',
+    'smplmt': '5000',
+    'lmt': '5000'
+}
+
+# 东方财富K线每行的前6个字段（其后为成交额等，不保存）
+EASTMONEY_KLINE_COLUMNS = ['日期', '开盘', '收盘', '最高', '最低', '成交量']
+EASTMONEY_KLINE_DTYPES = {'开盘': 'float64', '收盘': 'float64', '最高': 'float64', '最低': 'float64'}
+
+# 日线CSV解析结果缓存 {文件路径: ((修改时间, 文件大小), DataFrame)}
+_csv_cache = {}
+
+
+def _get_session():
+    """返回共用的HTTP会话，首次调用时创建"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+                session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+                _session = session
+    return _session
+
 
 def is_trading_time():
     """
@@ -28,42 +130,20 @@ def is_trading_time():
     """
     now = datetime.now()
     weekday = now.weekday()  # 0=周一, 6=周日
-    hour = now.hour
-    minute = now.minute
-    current_time = hour * 60 + minute  # 转为分钟数便于比较
+    current_time = now.hour * 60 + now.minute  # 转为分钟数便于比较
 
     # 周末不是交易日
     if weekday >= 5:
         return False, False, "周末休市"
 
-    # 交易时段（以分钟计）
-    morning_start = 9 * 60 + 30   # 9:30
-    morning_end = 11 * 60 + 30    # 11:30
-    afternoon_start = 13 * 60     # 13:00
-    afternoon_end = 15 * 60       # 15:00
-
-    # 判断是否在交易时段
-    in_morning = morning_start <= current_time <= morning_end
-    in_afternoon = afternoon_start <= current_time <= afternoon_end
-
-    if in_morning or in_afternoon:
-        return True, True, "交易时段中，日线数据将在收盘后(15:00)更新"
-    elif current_time < morning_start:
-        return True, False, "盘前，日线数据通常在收盘后(15:00)更新"
-    elif morning_end < current_time < afternoon_start:
-        return True, False, "午间休市，日线数据将在收盘后(15:00)更新"
-    elif current_time > afternoon_end:
-        return True, False, "已收盘，如数据未更新请稍后重试"
-
-    return True, False, ""
+    is_trading_hours, time_hint = TRADING_STATES[bisect.bisect_right(TRADING_BOUNDARIES, current_time)]
+    return True, is_trading_hours, time_hint
 
 
 def _get_realtime_sina():
     """新浪ETF实时行情接口"""
     try:
-        url = 'https://hq.sinajs.cn/list=sz159915'
-        headers = {'Referer': 'https://finance.sina.com.cn'}
-        resp = requests.get(url, headers=headers, timeout=5)
+        resp = _get_session().get(SINA_REALTIME_URL, headers=SINA_HEADERS, timeout=5)
 
         text = resp.text
         if '=""' in text or not text.strip():
@@ -102,8 +182,7 @@ def _get_realtime_sina():
 def _get_realtime_tencent():
     """腾讯ETF实时行情接口"""
     try:
-        url = 'https://qt.gtimg.cn/q=sz159915'
-        resp = requests.get(url, timeout=5)
+        resp = _get_session().get(TENCENT_REALTIME_URL, timeout=5)
 
         text = resp.text
         if '=""' in text or not text.strip() or 'v_' not in text:
@@ -142,28 +221,24 @@ def _get_realtime_tencent():
 def _get_realtime_eastmoney():
     """东方财富ETF实时行情接口"""
     try:
-        url = 'https://push2.eastmoney.com/api/qt/stock/get'
-        params = {
-            'secid': '0.159915',
-            'fields': 'f43,f44,f45,f46,f47,f48,f57,f58,f60,f169,f170',
-            'ut': 'fa5fd1943c7b386f172d6893dbfba10b'
-        }
-        resp = requests.get(url, params=params, timeout=5)
-        result = resp.json()
+        resp = _get_session().get(EASTMONEY_REALTIME_URL, params=EASTMONEY_REALTIME_PARAMS, timeout=5)
+        result = json_loads(resp.content)
 
-        if result.get('data'):
-            d = result['data']
+        d = result.get('data')
+        if d:
             now = datetime.now()
             # 东方财富返回的价格需要除以1000
+            price, high, low, open_price, yesterday_close = (
+                value / 1000 if value else 0 for value in map(d.get, ('f43', 'f44', 'f45', 'f46', 'f60')))
             return {
                 'name': d.get('f58', ''),
-                'price': d.get('f43', 0) / 1000 if d.get('f43') else 0,
-                'high': d.get('f44', 0) / 1000 if d.get('f44') else 0,
-                'low': d.get('f45', 0) / 1000 if d.get('f45') else 0,
-                'open': d.get('f46', 0) / 1000 if d.get('f46') else 0,
+                'price': price,
+                'high': high,
+                'low': low,
+                'open': open_price,
                 'volume': d.get('f47', 0),
                 'amount': d.get('f48', 0),
-                'yesterday_close': d.get('f60', 0) / 1000 if d.get('f60') else 0,
+                'yesterday_close': yesterday_close,
                 'date': now.strftime('%Y-%m-%d'),
                 'time': now.strftime('%H:%M:%S'),
                 'source': '东方财富'
@@ -177,8 +252,7 @@ def _get_realtime_eastmoney():
 def _get_realtime_netease():
     """网易ETF实时行情接口（备用）"""
     try:
-        url = f'http://api.money.126.net/data/feed/1159915,money.api'
-        resp = requests.get(url, timeout=5)
+        resp = _get_session().get(NETEASE_REALTIME_URL, timeout=5)
 
         text = resp.text
         # 网易返回格式: _ntes_quote_callback({...});
@@ -187,8 +261,7 @@ def _get_realtime_netease():
         if start >= end:
             return None
 
-        import json
-        data = json.loads(text[start:end])
+        data = json_loads(text[start:end])
         if '1159915' in data:
             d = data['1159915']
             now = datetime.now()
@@ -210,28 +283,127 @@ def _get_realtime_netease():
         return None
 
 
-def get_etf_realtime_price():
+# 实时行情接口优先级（按稳定性排序）及启动延迟（秒）：
+# 新浪先请求，未及时返回再陆续启动备用接口，正常情况只占用一个连接
+REALTIME_PROVIDERS = (
+    ('新浪', _get_realtime_sina, 0),
+    ('腾讯', _get_realtime_tencent, 0.25),
+    ('东方财富', _get_realtime_eastmoney, 0.25),
+    ('网易', _get_realtime_netease, 0.75),
+)
+
+
+def _is_valid_quote(result):
+    """接口返回的行情是否有效（有正的现价）"""
+    return bool(result) and result.get('price', 0) > 0
+
+
+def get_etf_realtime_price(force=False):
     """
     获取159915创业板ETF实时行情（带多个备用接口）
+    force: 为True时忽略缓存，重新请求接口
     返回: dict with keys: price, open, high, low, date, time, yesterday_close, source
           或 None（如果所有接口都失败）
     """
-    # 接口优先级列表（按稳定性排序）
-    providers = [
-        ('新浪', _get_realtime_sina),
-        ('腾讯', _get_realtime_tencent),
-        ('东方财富', _get_realtime_eastmoney),
-        ('网易', _get_realtime_netease),
-    ]
-
-    for name, func in providers:
-        try:
-            result = func()
-            if result and result.get('price', 0) > 0:
-                return result
-        except Exception as e:
-            print(f"{name}接口异常: {e}")
-            continue
+    with _realtime_lock:
+        cached = _realtime_cache['result']
+        if (not force and cached is not None
+                and time.monotonic() - _realtime_cache['time'] < REALTIME_CACHE_TTL):
+            return dict(cached)
+
+        result = _fetch_etf_realtime_price()
+        if result is not None:
+            _realtime_cache['time'] = time.monotonic()
+            _realtime_cache['result'] = result
+            return dict(result)
+        return None
+
+
+def _record_provider_result(name, ok):
+    """记录接口请求结果：成功时清除退避，失败时按连续失败次数加倍暂停时间"""
+    if ok:
+        _provider_backoff.pop(name, None)
+        return
+    failures = _provider_backoff.get(name, (0, 0.0))[0] + 1
+    delay = min(PROVIDER_BACKOFF_MAX, PROVIDER_BACKOFF_BASE * 2 ** (failures - 1))
+    _provider_backoff[name] = (failures, time.monotonic() + delay + random.uniform(0, 1))
+
+
+def start_background_refresh():
+    """启动后台线程，交易时段内定时刷新实时行情缓存，界面取行情时直接命中缓存（已在运行时不重复启动）"""
+    global _warm_stop
+    if _warm_stop is not None and not _warm_stop.is_set():
+        return
+    _warm_stop = threading.Event()
+    threading.Thread(target=_warm_realtime_cache, args=(_warm_stop,), daemon=True).start()
+
+
+def stop_background_refresh():
+    """停止后台预取线程（标签页隐藏、界面关闭或实时行情退避时调用）"""
+    if _warm_stop is not None:
+        _warm_stop.set()
+
+
+def _warm_realtime_cache(stop):
+    """后台预取线程：交易时段内刷新实时行情缓存，其余时间每分钟检查一次，stop置位后退出"""
+    while not stop.is_set():
+        if is_trading_time()[1]:
+            get_etf_realtime_price(force=True)
+            delay = REALTIME_WARM_INTERVAL + random.uniform(0, 2)
+        else:
+            delay = 60
+        stop.wait(delay)
+
+
+def _fetch_etf_realtime_price():
+    """依次（错开）启动各实时行情接口，返回最先成功的结果"""
+    # 跳过退避中的接口，全部在退避中时仍都尝试
+    now = time.monotonic()
+    providers = [p for p in REALTIME_PROVIDERS
+                 if _provider_backoff.get(p[0], (0, 0.0))[1] <= now] or REALTIME_PROVIDERS
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(providers))
+    futures = {}
+    pending = set()
+    next_index = 0
+    start = time.monotonic()
+    try:
+        while True:
+            elapsed = time.monotonic() - start
+            # 到时间的接口启动；已启动的都失败时不再等待，直接启动下一个
+            while next_index < len(providers) and (
+                    providers[next_index][2] <= elapsed or not pending):
+                name, func, _ = providers[next_index]
+                future = executor.submit(func)
+                futures[future] = name
+                pending.add(future)
+                next_index += 1
+
+            if elapsed >= REALTIME_TIMEOUT or not pending:
+                # 超时仍未返回的接口同样计为失败
+                for future in pending:
+                    _record_provider_result(futures[future], False)
+                break
+
+            if next_index < len(providers):
+                wait_time = providers[next_index][2] - elapsed
+            else:
+                wait_time = REALTIME_TIMEOUT - elapsed
+            done, pending = concurrent.futures.wait(
+                pending, timeout=wait_time,
+                return_when=concurrent.futures.FIRST_COMPLETED)
+
+            for future in done:
+                try:
+                    result = future.result()
+                    if _is_valid_quote(result):
+                        _record_provider_result(futures[future], True)
+                        return result
+                except Exception as e:
+                    print(f"{futures[future]}接口异常: {e}")
+                _record_provider_result(futures[future], False)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
     print("所有ETF实时行情接口均失败")
     return None
@@ -252,6 +424,56 @@ def get_data_path():
     return data_path
 
 
+def _parquet_path(file_path):
+    """CSV对应的parquet镜像路径"""
+    return os.path.splitext(file_path)[0] + '.parquet'
+
+
+def _read_history(file_path):
+    """读取ETF日线数据，parquet镜像比CSV新时直接读取镜像，否则解析CSV并生成镜像"""
+    parquet_path = _parquet_path(file_path)
+    if HAS_PARQUET and os.path.exists(parquet_path) and \
+            os.stat(parquet_path).st_mtime_ns >= os.stat(file_path).st_mtime_ns:
+        try:
+            return pd.read_parquet(parquet_path)
+        except Exception as e:
+            print(f"读取parquet缓存失败: {e}")
+
+    df = pd.read_csv(file_path, encoding='utf-8-sig', engine='c')
+    df['日期'] = pd.to_datetime(df['日期'])
+    save_parquet_mirror(df, file_path)
+    return df
+
+
+def read_history_csv(file_path):
+    """读取ETF日线CSV（日期列已解析），文件未变化时复用上次的解析结果（返回副本）"""
+    stat = os.stat(file_path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _csv_cache.get(file_path)
+    if cached is None or cached[0] != key:
+        cached = (key, _read_history(file_path))
+        _csv_cache[file_path] = cached
+    return cached[1].copy()
+
+
+def save_parquet_mirror(df, file_path):
+    """将日线数据另存为parquet镜像（未安装pyarrow时跳过）"""
+    if not HAS_PARQUET:
+        return
+    try:
+        df.to_parquet(_parquet_path(file_path), compression='zstd', index=False)
+    except Exception as e:
+        print(f"写入parquet缓存失败: {e}")
+
+
+def save_history_csv(df, file_path):
+    """保存ETF日线CSV（并更新parquet镜像）：先写临时文件再替换原文件，写入中断不会损坏原数据"""
+    tmp_path = file_path + '.tmp'
+    df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+    os.replace(tmp_path, file_path)
+    save_parquet_mirror(df, file_path)
+
+
 def update_etf_data():
     """
     更新159915 ETF数据
@@ -273,8 +495,7 @@ def update_etf_data():
 
         # 读取现有数据
         if os.path.exists(file_path):
-            df_old = pd.read_csv(file_path, encoding='utf-8-sig')
-            df_old['日期'] = pd.to_datetime(df_old['日期'])
+            df_old = read_history_csv(file_path)
             last_date = df_old['日期'].max()
             print(f"现有数据最新日期: {last_date.strftime('%Y-%m-%d')}")
         else:
@@ -321,7 +542,7 @@ def update_etf_data():
                     df = df.drop_duplicates(subset=['日期'], keep='last')
                     df = df.sort_values('日期').reset_index(drop=True)
 
-                    df.to_csv(file_path, index=False, encoding='utf-8-sig')
+                    save_history_csv(df, file_path)
 
                     return f"数据更新成功，共{len(df)}条记录，最新日期: {df['日期'].max().strftime('%Y-%m-%d')}"
                 else:
@@ -358,55 +579,40 @@ def update_from_eastmoney():
         data_path = get_data_path()
         file_path = os.path.join(data_path, '159915_创业板ETF_day.csv')
 
-        # 东方财富日线数据API
-        url = 'https://push2his.eastmoney.com/api/qt/stock/kline/get'
-        params = {
-            'secid': '0.159915',
-            'fields1': 'f1,f2,f3,f4,f5,f6',
-            'fields2': 'f51,f52,f53,f54,f55,f56,f57',
-            'klt': '101',  # 日线
-            'fqt': '0',    # 不复权
-            'beg': '20150101',
-            'end': '20500101',
-            'ut': 'fa5fd1943c7b386f172d6893dbfba10b',
-            'smplmt': '5000',
-            'lmt': '5000'
-        }
-
-        resp = requests.get(url, params=params, timeout=30)
-        result = resp.json()
-
-        if result.get('data') and result['data'].get('klines'):
-            klines = result['data']['klines']
-            rows = []
-            for line in klines:
-                parts = line.split(',')
-                if len(parts) >= 6:
-                    rows.append({
-                        '日期': parts[0],
-                        '开盘': float(parts[1]),
-                        '收盘': float(parts[2]),
-                        '最高': float(parts[3]),
-                        '最低': float(parts[4]),
-                        '成交量': int(parts[5])
-                    })
-
-            df = pd.DataFrame(rows)
-            df['日期'] = pd.to_datetime(df['日期'])
-            df = df.sort_values('日期').reset_index(drop=True)
+        # 先读取现有数据，只请求最新日期起（含当天，覆盖盘中写入的实时数据）的K线
+        required_cols = ['日期', '开盘', '最高', '最低', '收盘', '成交量']
+        df_old = None
+        beg = '20150101'
+        if os.path.exists(file_path):
+            df_old = read_history_csv(file_path)
+            df_old = df_old[[c for c in required_cols if c in df_old.columns]]
+            if len(df_old) > 0:
+                beg = df_old['日期'].max().strftime('%Y%m%d')
+
+        params = dict(EASTMONEY_KLINE_PARAMS, beg=beg)
+        resp = _get_session().get(EASTMONEY_KLINE_URL, params=params, timeout=30)
+        result = json_loads(resp.content)
+
+        klines = (result.get('data') or {}).get('klines') or []
+        if klines:
+            # 所有K线拼成CSV文本一次解析，字段不足或日期无效的行丢弃
+            df = pd.read_csv(io.StringIO('\n'.join(klines)), header=None, engine='c',
+                             usecols=range(len(EASTMONEY_KLINE_COLUMNS)), names=EASTMONEY_KLINE_COLUMNS,
+                             dtype=EASTMONEY_KLINE_DTYPES)
+            df['日期'] = pd.to_datetime(df['日期'], errors='coerce')
+            df = df.dropna()
+            df['成交量'] = df['成交量'].astype('int64')
 
             # 与现有数据合并
-            if os.path.exists(file_path):
-                df_old = pd.read_csv(file_path, encoding='utf-8-sig')
-                df_old['日期'] = pd.to_datetime(df_old['日期'])
-
-                required_cols = ['日期', '开盘', '最高', '最低', '收盘', '成交量']
-                df_old = df_old[[c for c in required_cols if c in df_old.columns]]
-
+            if df_old is not None:
                 df = pd.concat([df_old, df], ignore_index=True)
                 df = df.drop_duplicates(subset=['日期'], keep='last')
-                df = df.sort_values('日期').reset_index(drop=True)
+            df = df.sort_values('日期').reset_index(drop=True)
+        else:
+            # 没有新K线（如盘前），沿用现有数据
+            df = df_old
 
+        if df is not None and len(df) > 0:
             # 如果是交易日，尝试获取今天的实时数据
             today = datetime.now().date()
             latest_date = df['日期'].max().date()
@@ -415,7 +621,7 @@ def update_from_eastmoney():
                 is_trade_day, is_trade_hours, _ = is_trading_time()
                 if is_trade_day:
                     realtime = get_etf_realtime_price()
-                    if realtime and realtime.get('price', 0) > 0:
+                    if _is_valid_quote(realtime):
                         today_row = {
                             '日期': pd.Timestamp(today),
                             '开盘': realtime.get('open', realtime['price']),
@@ -428,7 +634,9 @@ def update_from_eastmoney():
                         df = df.sort_values('日期').reset_index(drop=True)
                         print(f"已添加今日实时数据: {realtime['price']}")
 
-            df.to_csv(file_path, index=False, encoding='utf-8-sig')
+            # 数据没有变化时不重写文件
+            if df_old is None or not df.equals(df_old):
+                save_history_csv(df, file_path)
 
             return f"数据更新成功（东方财富），共{len(df)}条记录，最新日期: {df['日期'].max().strftime('%Y-%m-%d')}"
 
@@ -449,8 +657,7 @@ def check_data_status():
             'message': '数据文件不存在'
         }
 
-    df = pd.read_csv(file_path, encoding='utf-8-sig')
-    df['日期'] = pd.to_datetime(df['日期'])
+    df = read_history_csv(file_path)
 
     latest_date = df['日期'].max()
     today = datetime.now().date()